@@ -8,20 +8,37 @@ BINANCE_CONFIG = {
     "API_SECRET": os.getenv("BINANCE_API_SECRET", ""),
     "TESTNET": os.getenv("BINANCE_TESTNET", "True").lower() == "true",
     
-    "REST_BASE_URL": "https://api.binance.com",
-    "TESTNET_BASE_URL": "https://testnet.binance.vision",
+    "REST_BASE_URL": os.getenv("BINANCE_REST_BASE_URL", "https://api.binance.com"),
+    "TESTNET_BASE_URL": os.getenv("BINANCE_TESTNET_BASE_URL", "https://testnet.binance.vision"),
     "RATE_LIMIT_REQUESTS": 1200,
     "RATE_LIMIT_PERIOD": 60,
+    "RATE_LIMIT_RETRIES": 3,
     
-    "WS_BASE_URL": "wss://stream.binance.com:9443/ws",
-    "WS_TESTNET_URL": "wss://testnet.binance.vision/ws",
+    "HTTP_POOL_LIMIT": 100,
+    "HTTP_POOL_LIMIT_PER_HOST": 20,
+    "HTTP_KEEPALIVE_TIMEOUT": 60.0,
+    "HTTP_DNS_CACHE_TTL": 300,
+    "HTTP_HAPPY_EYEBALLS_DELAY": 0.25,
+    "HTTP_CONNECT_TIMEOUT": 5.0,
+    "HTTP_REQUEST_TIMEOUT": 10.0,
+    "HTTP_WARM_CONNECTIONS": 4,
+    "HTTP_KEEP_WARM_INTERVAL": 30.0,
+    
+    "KLINES_PAGE_LIMIT": 1000,
+    "KLINES_CONCURRENCY": 10,
+    
+    "WS_BASE_URL": os.getenv("BINANCE_WS_BASE_URL", "wss://stream.binance.com:9443/ws"),
+    "WS_TESTNET_URL": os.getenv("BINANCE_WS_TESTNET_URL", "wss://testnet.binance.vision/ws"),
     "WS_TIMEOUT": 10,
     "WS_RECONNECT_DELAY": 5,
     "WS_MAX_RECONNECT_ATTEMPTS": 5,
     
     "SYMBOLS": [
-        "BTCUSDT", "ETHUSDT", "ADAUSDT", "DOTUSDT", "LINKUSDT",
-        "BNBUSDT", "XRPUSDT", "LTCUSDT", "BCHUSDT", "EOSUSDT"
+        symbol.strip() for symbol in os.getenv(
+            "BINANCE_SYMBOLS",
+            "BTCUSDT,ETHUSDT,ADAUSDT,DOTUSDT,LINKUSDT,"
+            "BNBUSDT,XRPUSDT,LTCUSDT,BCHUSDT,EOSUSDT"
+        ).split(",") if symbol.strip()
     ],
     
     "STREAMS": [
@@ -30,14 +47,34 @@ BINANCE_CONFIG = {
     ],
     
     "ENDPOINTS": {
+        "ping": "/api/v3/ping",
+        "server_time": "/api/v3/time",
         "exchange_info": "/api/v3/exchangeInfo",
         "klines": "/api/v3/klines",
+        "depth": "/api/v3/depth",
         "ticker_24hr": "/api/v3/ticker/24hr",
+        "ticker_price": "/api/v3/ticker/price",
         "account_info": "/api/v3/account",
         "create_order": "/api/v3/order",
         "query_order": "/api/v3/order",
         "cancel_order": "/api/v3/order",
         "open_orders": "/api/v3/openOrders",
         "all_orders": "/api/v3/allOrders",
-    }
+    },
+    
+    # request weight per endpoint: (with a symbol, for all symbols)
+    "REQUEST_WEIGHTS": {
+        "/api/v3/ping": (1, 1),
+        "/api/v3/time": (1, 1),
+        "/api/v3/exchangeInfo": (20, 20),
+        "/api/v3/klines": (2, 2),
+        "/api/v3/ticker/24hr": (2, 80),
+        "/api/v3/ticker/price": (2, 4),
+        "/api/v3/account": (20, 20),
+        "/api/v3/order": (1, 1),
+        "/api/v3/openOrders": (6, 80),
+        "/api/v3/allOrders": (20, 20),
+    },
+    # depth weight by the largest limit it covers
+    "DEPTH_WEIGHTS": [(100, 5), (500, 25), (1000, 50), (5000, 250)],
 }
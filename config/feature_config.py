@@ -3,9 +3,11 @@ FEATURE_CONFIG = {
     "ORDER_BLOCKS_WINDOW": 50,
     "FVG_WINDOW": 30,
     "ORDER_FLOW_WINDOW": 1000,
+    "ORDER_FLOW_TIME_WINDOWS": [10, 60, 300],
     
     "TIMEFRAMES": ["1h", "15m", "5m", "1m"],
     "PRIMARY_TIMEFRAME": "15m",
+    "CONVERGENCE_TIMEFRAMES": ["1m", "5m", "15m"],
     
     "ADX_HARD_REJECT": 10.0,
     "ADX_STRONG_PENALTY": 15.0,
@@ -17,6 +19,11 @@ FEATURE_CONFIG = {
     "MACD_SLOW": 26,
     "MACD_SIGNAL": 9,
     "ATR_PERIOD": 14,
+    "ADX_PERIOD": 14,
+    
+    "STREAMING_FEATURES": False,
+    "WARM_START_ENABLED": True,
+    "WARM_START_CONCURRENCY": 8,
     
     "FEATURE_UPDATE_INTERVAL": 1.0,
     "FEATURE_CACHE_TTL": 300,
@@ -13,4 +13,7 @@ PERSISTENCE_CONFIG = {
     "AUTO_RECOVERY": True,
     "RECOVERY_TIMEOUT": 30,
     "STATE_SAVE_INTERVAL": 60,
+    
+    "SNAPSHOT_ENABLED": True,
+    "SNAPSHOT_MAX_AGE": 900,
 }
@@ -19,4 +19,7 @@ TRADING_CONFIG = {
     "ORDER_TIMEOUT": 30,
     "ORDER_RETRY_ATTEMPTS": 3,
     "SLIPPAGE_TOLERANCE": 0.001,
+    
+    "EXCHANGE_INFO_REFRESH_INTERVAL": 3600,
+    "EXCHANGE_INFO_RETRY_INTERVAL": 10,
 }
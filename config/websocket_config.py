@@ -1,6 +1,9 @@
 WEBSOCKET_CONFIG = {
     "MAX_LATENCY": 0.1,
+    "LATENCY_WINDOW": 60.0,
+    "LATENCY_WARNING_INTERVAL": 10.0,
     "BUFFER_SIZE": 1000,
+    "BUFFER_MAX_AGE": 86400,
     "RECONNECT_DELAY": 1.0,
     "HEARTBEAT_INTERVAL": 30.0,
     
@@ -10,8 +13,24 @@ WEBSOCKET_CONFIG = {
     
     "TIMESTAMP_SYNC_INTERVAL": 300.0,
     "MAX_TIMESTAMP_DRIFT": 0.5,
+    "TIMESTAMP_SYNC_SAMPLES": 5,
+    
+    "FAST_DECODE": True,
+    
+    "ORDER_BOOK_ENABLED": False,
+    "ORDER_BOOK_SNAPSHOT_DEPTH": 100,
+    "ORDER_BOOK_LEVELS": 20,
+    "ORDER_BOOK_MAX_LEVELS": 500,
+    
+    "BOOK_TICKER_ENABLED": True,
+    "PRICE_CACHE_MAX_AGE": 5.0,
     
     "MESSAGE_BATCH_SIZE": 10,
     "PROCESSING_CONCURRENCY": 5,
-    "MEMORY_CLEANUP_INTERVAL": 60,
+    "PROCESSING_QUEUE_SIZE": 10000,
+    
+    "RECORDER_ENABLED": False,
+    "RECORDER_CHUNK_FRAMES": 1000,
+    "RECORDER_MAX_FILE_MB": 64,
+    "RECORDER_MAX_FILES": 24,
 }
@@ -0,0 +1,121 @@
+import json
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+try:
+    import orjson
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+
+class TradeRecord(NamedTuple):
+    symbol: str
+    event_time: int
+    trade_time: int
+    price: float
+    quantity: float
+    is_buyer_maker: bool
+    received_at: float
+
+
+class KlineRecord(NamedTuple):
+    symbol: str
+    event_time: int
+    open_time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    closed: bool
+    received_at: float
+
+
+Message = Union[TradeRecord, KlineRecord, Dict[str, Any]]
+
+
+def decode_frame(raw: Union[str, bytes],
+                 received_at: float,
+                 fast_path: bool = True) -> Tuple[Optional[str], Message]:
+    """Decodes one combined-stream frame into ``(stream, message)``.
+
+    ``@trade`` and ``@kline_*`` payloads become compact records holding only
+    the fields the engine reads, already converted to numbers. Every other
+    frame is returned as the parsed dict with ``received_at`` added; frames
+    without a ``stream`` (subscription acks) come back with stream None.
+    """
+    frame = loads(raw)
+    stream = frame.get('stream')
+    if stream is None:
+        return None, frame
+
+    if fast_path:
+        data = frame['data']
+        if stream.endswith('@trade'):
+            return stream, TradeRecord(
+                data['s'],
+                data['E'],
+                data['T'],
+                float(data['p']),
+                float(data['q']),
+                data['m'],
+                received_at,
+            )
+        if '@kline_' in stream:
+            k = data['k']
+            return stream, KlineRecord(
+                data['s'],
+                data['E'],
+                k['t'],
+                float(k['o']),
+                float(k['h']),
+                float(k['l']),
+                float(k['c']),
+                float(k['v']),
+                k['x'],
+                received_at,
+            )
+
+    frame['received_at'] = received_at
+    return stream, frame
+
+
+def event_time(message: Message) -> Optional[int]:
+    if isinstance(message, dict):
+        return message.get('data', {}).get('E')
+    return message.event_time
+
+
+def received_time(message: Message) -> float:
+    if isinstance(message, dict):
+        return message.get('received_at', 0)
+    return message.received_at
+
+
+def is_closed_kline(message: Message) -> bool:
+    if isinstance(message, KlineRecord):
+        return message.closed
+    if isinstance(message, dict):
+        return bool(message.get('data', {}).get('k', {}).get('x'))
+    return False
+
+
+_RECORD_TYPES = {'trade': TradeRecord, 'kline': KlineRecord}
+
+
+def message_to_json(message: Message) -> Dict[str, Any]:
+    """Tags a message with its record type so it can go through plain JSON."""
+    if isinstance(message, TradeRecord):
+        return {'type': 'trade', 'fields': list(message)}
+    if isinstance(message, KlineRecord):
+        return {'type': 'kline', 'fields': list(message)}
+    return {'type': 'frame', 'frame': message}
+
+
+def message_from_json(data: Dict[str, Any]) -> Message:
+    record_type = _RECORD_TYPES.get(data['type'])
+    if record_type is None:
+        return data['frame']
+    return record_type(*data['fields'])
@@ -1,271 +1,512 @@
+import time
 import numpy as np
-from typing import Dict, List, Any, Optional
-from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
 
-from config import FEATURE_CONFIG
+from config import FEATURE_CONFIG, MODEL_CONFIG
+from core.decoder import KlineRecord, TradeRecord
+from core.feature_kernels import FULL_WINDOW_BARS, compute_kline_features, converge
+from core.indicators import IndicatorSet
+from core.order_flow import TimeWindowFlow, order_flow_imbalance
+from core.resampler import INTERVAL_MS, BarResampler, Bar
+from core.ring_buffer import KlineBuffer, TradeBuffer
+from core.streaming_features import StreamingFeatureState
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+BASE_TIMEFRAME = '1m'
+
 class FeatureEngine:
     def __init__(self):
-        self.kline_buffers: Dict[str, deque] = {}
-        self.trade_buffers: Dict[str, deque] = {}
+        self.kline_buffers: Dict[str, KlineBuffer] = {}
+        self.timeframe_buffers: Dict[str, Dict[str, KlineBuffer]] = {}
+        self.resamplers: Dict[str, Dict[str, BarResampler]] = {}
+        self.resample_timeframes = [
+            tf for tf in FEATURE_CONFIG["TIMEFRAMES"] if tf != BASE_TIMEFRAME
+        ]
+        self._timeframe_trends: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        self.kline_gaps: Dict[str, Tuple[int, int]] = {}
+        self.gaps_detected = 0
+        self.indicator_timeframe = FEATURE_CONFIG["PRIMARY_TIMEFRAME"]
+        self.indicators: Dict[str, IndicatorSet] = {}
+        self.trade_buffers: Dict[str, TradeBuffer] = {}
+        self.flow_windows: Dict[str, Dict[int, TimeWindowFlow]] = {}
         self.feature_cache: Dict[str, Dict[str, Any]] = {}
+        self.cache_state: Dict[str, Tuple[int, float]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.streaming = FEATURE_CONFIG["STREAMING_FEATURES"]
+        self.streaming_states: Dict[str, StreamingFeatureState] = {}
         
     def add_kline(self, symbol: str, kline_data: Dict[str, Any]):
-        if symbol not in self.kline_buffers:
-            self.kline_buffers[symbol] = deque(
-                maxlen=FEATURE_CONFIG["MARKET_STRUCTURE_WINDOW"]
-            )
-        
-        kline = {
-            'timestamp': kline_data.get('t', 0),
-            'open': float(kline_data.get('o', 0)),
-            'high': float(kline_data.get('h', 0)),
-            'low': float(kline_data.get('l', 0)),
-            'close': float(kline_data.get('c', 0)),
-            'volume': float(kline_data.get('v', 0)),
-        }
-        self.kline_buffers[symbol].append(kline)
+        bar = (
+            kline_data.get('t', 0),
+            float(kline_data.get('o', 0)),
+            float(kline_data.get('h', 0)),
+            float(kline_data.get('l', 0)),
+            float(kline_data.get('c', 0)),
+            float(kline_data.get('v', 0)),
+        )
+        self._append_bar(symbol, bar)
     
-    def add_trade(self, symbol: str, trade_data: Dict[str, Any]):
-        if symbol not in self.trade_buffers:
-            self.trade_buffers[symbol] = deque(
-                maxlen=FEATURE_CONFIG["ORDER_FLOW_WINDOW"]
-            )
-        
-        trade = {
-            'timestamp': trade_data.get('T', 0),
-            'price': float(trade_data.get('p', 0)),
-            'quantity': float(trade_data.get('q', 0)),
-            'is_buyer_maker': trade_data.get('m', False)
+    def add_kline_record(self, record: KlineRecord):
+        self._append_bar(record.symbol, (
+            record.open_time,
+            record.open,
+            record.high,
+            record.low,
+            record.close,
+            record.volume,
+        ))
+    
+    def _ensure_symbol(self, symbol: str):
+        if symbol in self.kline_buffers:
+            return
+        
+        window = FEATURE_CONFIG["MARKET_STRUCTURE_WINDOW"]
+        self.kline_buffers[symbol] = KlineBuffer(window)
+        self.timeframe_buffers[symbol] = {
+            tf: KlineBuffer(window) for tf in self.resample_timeframes
         }
-        self.trade_buffers[symbol].append(trade)
+        self.resamplers[symbol] = {
+            tf: BarResampler(tf, BASE_TIMEFRAME) for tf in self.resample_timeframes
+        }
+        self.indicators[symbol] = IndicatorSet()
     
-    def calculate_features(self, symbol: str) -> Optional[Dict[str, Any]]:
-        if symbol not in self.kline_buffers or len(self.kline_buffers[symbol]) < 30:
-            return None
-        
-        klines = list(self.kline_buffers[symbol])
-        
-        features = {}
-        
-        features['market_structure_trend'] = self._calculate_market_structure(klines)
-        features['order_blocks_count'] = self._count_order_blocks(klines)
-        features['institutional_candle'] = self._detect_institutional_candle(klines)
-        features['liquidity_grab'] = self._detect_liquidity_grab(klines)
-        features['order_flow_value'] = self._calculate_order_flow(symbol)
-        features['fvg_count'] = self._count_fair_value_gaps(klines)
-        
-        features['trend_alignment'] = self._calculate_trend_alignment(klines)
-        features['swing_high_distance'] = self._calculate_swing_distance(klines, 'high')
-        features['structure_integrity'] = self._calculate_structure_integrity(klines)
-        features['institutional_participation'] = self._calculate_institutional_participation(klines)
-        features['timeframe_convergence'] = self._calculate_timeframe_convergence(klines)
-        features['liquidity_context'] = self._calculate_liquidity_context(klines)
-        
-        self.feature_cache[symbol] = features
-        
-        return features
+    def _buffer(self, symbol: str, timeframe: str) -> Optional[KlineBuffer]:
+        if timeframe == BASE_TIMEFRAME:
+            return self.kline_buffers.get(symbol)
+        return self.timeframe_buffers.get(symbol, {}).get(timeframe)
     
-    def _calculate_market_structure(self, klines: List[Dict]) -> float:
-        if len(klines) < 10:
-            return 0.0
-        
-        closes = [k['close'] for k in klines[-50:]]
-        
-        higher_highs = 0
-        higher_lows = 0
-        lower_highs = 0
-        lower_lows = 0
-        
-        for i in range(10, len(closes)):
-            if closes[i] > max(closes[i-10:i]):
-                higher_highs += 1
-            if closes[i] < min(closes[i-10:i]):
-                lower_lows += 1
-        
-        if higher_highs > lower_lows:
-            return min(higher_highs / len(closes) * 2, 1.0)
+    @staticmethod
+    def _is_stale(buffer: KlineBuffer, bar: Bar) -> bool:
+        return len(buffer) > 0 and bar[0] <= buffer.latest('timestamp')
+    
+    def _append_bar(self, symbol: str, bar: Bar):
+        self._ensure_symbol(symbol)
+        buffer = self.kline_buffers[symbol]
+        if self._is_stale(buffer, bar):
+            return
+        
+        if len(buffer):
+            expected = int(buffer.latest('timestamp')) + INTERVAL_MS[BASE_TIMEFRAME]
+            if int(bar[0]) > expected:
+                self._record_gap(symbol, expected, int(bar[0]) - INTERVAL_MS[BASE_TIMEFRAME])
+                for resampler in self.resamplers[symbol].values():
+                    resampler.mark_incomplete()
+        
+        buffer.append(*bar)
+        
+        if self.streaming:
+            if symbol not in self.streaming_states:
+                self.streaming_states[symbol] = StreamingFeatureState()
+            self.streaming_states[symbol].update(*bar[1:])
+        
+        if self.indicator_timeframe == BASE_TIMEFRAME:
+            self.indicators[symbol].update(*bar[2:5])
+        
+        for timeframe, resampler in self.resamplers[symbol].items():
+            for completed in resampler.update(bar):
+                self._append_timeframe_bar(symbol, timeframe, completed)
+    
+    def _record_gap(self, symbol: str, start: int, end: int):
+        if symbol in self.kline_gaps:
+            known_start, known_end = self.kline_gaps[symbol]
+            start, end = min(start, known_start), max(end, known_end)
+        self.kline_gaps[symbol] = (start, end)
+        self.gaps_detected += 1
+        
+        logger.warning("kline_gap_detected",
+                      symbol=symbol,
+                      start=start,
+                      end=end,
+                      missing_bars=(end - start) // INTERVAL_MS[BASE_TIMEFRAME] + 1)
+    
+    def get_kline_gaps(self) -> Dict[str, Tuple[int, int]]:
+        """Missing base open-time ranges ``(first, last)`` per symbol, inclusive."""
+        return dict(self.kline_gaps)
+    
+    def clear_kline_gap(self, symbol: str, start: int, end: int):
+        # a newer gap may have been merged in while the backfill was in flight
+        if symbol not in self.kline_gaps:
+            return
+        
+        known_start, known_end = self.kline_gaps[symbol]
+        if known_end > end:
+            self.kline_gaps[symbol] = (max(known_start, end + INTERVAL_MS[BASE_TIMEFRAME]), known_end)
         else:
-            return max(-lower_lows / len(closes) * 2, -1.0)
+            del self.kline_gaps[symbol]
+    
+    def _append_timeframe_bar(self, symbol: str, timeframe: str, bar: Bar):
+        buffer = self.timeframe_buffers[symbol][timeframe]
+        if self._is_stale(buffer, bar):
+            return
+        
+        buffer.append(*bar)
+        if timeframe == self.indicator_timeframe:
+            self.indicators[symbol].update(*bar[2:5])
+    
+    def load_klines(self,
+                    symbol: str,
+                    klines: List[List[Any]],
+                    timeframe: str = BASE_TIMEFRAME,
+                    now_ms: Optional[float] = None) -> int:
+        """Merges REST klines into the buffers, skipping the still-open bar and any duplicates."""
+        if now_ms is None:
+            now_ms = time.time() * 1000
+        
+        bars = [
+            (float(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+            for k in klines if int(k[6]) < now_ms
+        ]
+        return self._merge_bars(symbol, timeframe, bars)
+    
+    def load_kline_array(self,
+                         symbol: str,
+                         bars: np.ndarray,
+                         timeframe: str = BASE_TIMEFRAME,
+                         now_ms: Optional[float] = None) -> int:
+        """Same as ``load_klines`` for an array with KlineBuffer.COLUMNS as columns."""
+        if now_ms is None:
+            now_ms = time.time() * 1000
+        
+        closed = bars[bars[:, 0] + INTERVAL_MS[timeframe] <= now_ms]
+        return self._merge_bars(symbol, timeframe, [tuple(row) for row in closed.tolist()])
     
-    def _count_order_blocks(self, klines: List[Dict]) -> int:
-        if len(klines) < FEATURE_CONFIG["ORDER_BLOCKS_WINDOW"]:
+    def _merge_bars(self, symbol: str, timeframe: str, bars: List[Bar]) -> int:
+        self._ensure_symbol(symbol)
+        buffer = self._buffer(symbol, timeframe)
+        if buffer is None:
             return 0
         
-        order_blocks = 0
-        recent_klines = klines[-FEATURE_CONFIG["ORDER_BLOCKS_WINDOW"]:]
-        
-        for i in range(3, len(recent_klines)):
-            body = abs(recent_klines[i]['close'] - recent_klines[i]['open'])
-            range_size = recent_klines[i]['high'] - recent_klines[i]['low']
+        merged: Dict[int, Bar] = {int(bar[0]): bar for bar in bars}
+        
+        existing = buffer.view()
+        existing_times = {int(t) for t in existing['timestamp']}
+        latest = max(existing_times, default=None)
+        for row in zip(*(existing[name] for name in KlineBuffer.COLUMNS)):
+            merged[int(row[0])] = tuple(float(v) for v in row)
+        
+        ordered = [merged[t] for t in sorted(merged)][-buffer.capacity:]
+        buffer.clear()
+        for bar in ordered:
+            buffer.append(*bar)
+        
+        rebuild_indicators = timeframe == self.indicator_timeframe
+        if timeframe == BASE_TIMEFRAME:
+            if self.streaming:
+                state = StreamingFeatureState()
+                for bar in ordered:
+                    state.update(*bar[1:])
+                self.streaming_states[symbol] = state
             
-            if range_size > 0 and body / range_size > 0.7:
-                volume_ratio = recent_klines[i]['volume'] / np.mean(
-                    [k['volume'] for k in recent_klines[max(0, i-10):i]]
-                )
-                if volume_ratio > 1.5:
-                    order_blocks += 1
-        
-        return order_blocks
-    
-    def _detect_institutional_candle(self, klines: List[Dict]) -> bool:
-        if len(klines) < 5:
-            return False
-        
-        latest = klines[-1]
-        avg_volume = np.mean([k['volume'] for k in klines[-20:-1]])
-        
-        body = abs(latest['close'] - latest['open'])
-        range_size = latest['high'] - latest['low']
+            # bars inserted behind the newest one (a backfilled gap) change
+            # higher-timeframe buckets that were already emitted; drop those
+            # and let the resamplers rebuild them from the merged base bars
+            inserted = [
+                int(bar[0]) for bar in ordered
+                if latest is not None and bar[0] < latest and int(bar[0]) not in existing_times
+            ]
+            for resampled in self.resample_timeframes:
+                if inserted and self._truncate_resampled(symbol, resampled, min(inserted)):
+                    rebuild_indicators |= resampled == self.indicator_timeframe
+                self._prime_resampler(symbol, resampled)
+        else:
+            self._prime_resampler(symbol, timeframe)
         
-        is_large_body = range_size > 0 and body / range_size > 0.8
-        is_high_volume = latest['volume'] > avg_volume * 2
+        if rebuild_indicators:
+            self._rebuild_indicators(symbol)
         
-        return is_large_body and is_high_volume
+        return len(bars)
     
-    def _detect_liquidity_grab(self, klines: List[Dict]) -> bool:
-        if len(klines) < 10:
+    def _truncate_resampled(self, symbol: str, timeframe: str, since: int) -> bool:
+        interval_ms = INTERVAL_MS[timeframe]
+        cut = since // interval_ms * interval_ms
+        base = self.kline_buffers[symbol]
+        if len(base) == 0:
+            return False
+        first = int(base.view()['timestamp'][0])
+        if first > cut:
+            # only rebuild buckets the base buffer fully covers
+            cut = -(-first // interval_ms) * interval_ms
+        
+        target = self.timeframe_buffers[symbol][timeframe]
+        rows = target.view()
+        keep = rows['timestamp'] < cut
+        if keep.all():
             return False
         
-        recent = klines[-10:]
-        latest = klines[-1]
-        
-        prev_high = max(k['high'] for k in recent[:-1])
-        prev_low = min(k['low'] for k in recent[:-1])
-        
-        grabbed_high = latest['high'] > prev_high and latest['close'] < prev_high
-        grabbed_low = latest['low'] < prev_low and latest['close'] > prev_low
-        
-        return grabbed_high or grabbed_low
+        kept = [row for row, k in zip(zip(*(rows[name] for name in KlineBuffer.COLUMNS)), keep) if k]
+        target.clear()
+        for row in kept:
+            target.append(*row)
+        return True
     
-    def _calculate_order_flow(self, symbol: str) -> float:
-        if symbol not in self.trade_buffers or len(self.trade_buffers[symbol]) < 100:
-            return 0.0
-        
-        trades = list(self.trade_buffers[symbol])[-1000:]
-        
-        buy_volume = sum(t['quantity'] for t in trades if not t['is_buyer_maker'])
-        sell_volume = sum(t['quantity'] for t in trades if t['is_buyer_maker'])
-        
-        total_volume = buy_volume + sell_volume
-        if total_volume == 0:
-            return 0.0
-        
-        return (buy_volume - sell_volume) / total_volume
+    def _prime_resampler(self, symbol: str, timeframe: str):
+        # replay base bars newer than the last stored bar so the open bucket is complete
+        resampler = BarResampler(timeframe, BASE_TIMEFRAME)
+        self.resamplers[symbol][timeframe] = resampler
+        
+        target = self.timeframe_buffers[symbol][timeframe]
+        start = (target.latest('timestamp') + resampler.interval_ms
+                 if len(target) else float('-inf'))
+        
+        base = self.kline_buffers[symbol].view()
+        for row in zip(*(base[name] for name in KlineBuffer.COLUMNS)):
+            if row[0] >= start:
+                for completed in resampler.update(row):
+                    self._append_timeframe_bar(symbol, timeframe, completed)
     
-    def _count_fair_value_gaps(self, klines: List[Dict]) -> int:
-        if len(klines) < FEATURE_CONFIG["FVG_WINDOW"]:
-            return 0
-        
-        fvg_count = 0
-        recent = klines[-FEATURE_CONFIG["FVG_WINDOW"]:]
-        
-        for i in range(2, len(recent)):
-            gap_up = recent[i]['low'] > recent[i-2]['high']
-            gap_down = recent[i]['high'] < recent[i-2]['low']
-            
-            if gap_up or gap_down:
-                fvg_count += 1
+    def _rebuild_indicators(self, symbol: str):
+        indicators = IndicatorSet()
+        klines = self._buffer(symbol, self.indicator_timeframe).view()
+        for high, low, close in zip(klines['high'], klines['low'], klines['close']):
+            indicators.update(high, low, close)
+        self.indicators[symbol] = indicators
+    
+    def get_indicators(self, symbol: str) -> Dict[str, Optional[float]]:
+        if symbol not in self.indicators:
+            return {}
+        return self.indicators[symbol].values()
+    
+    def get_klines(self,
+                   symbol: str,
+                   timeframe: str = BASE_TIMEFRAME,
+                   count: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        buffer = self._buffer(symbol, timeframe)
+        if buffer is None:
+            return None
+        return buffer.view(count)
+    
+    def _generation(self, symbol: str) -> int:
+        return self.kline_buffers[symbol].generation + sum(
+            buffer.generation for buffer in self.timeframe_buffers[symbol].values()
+        )
+    
+    def _timeframe_trend(self, symbol: str, timeframe: str) -> float:
+        buffer = self._buffer(symbol, timeframe)
+        if buffer is None or len(buffer) < 10:
+            return np.nan
+        
+        cached = self._timeframe_trends.get((symbol, timeframe))
+        if cached is not None and cached[0] == buffer.generation:
+            return cached[1]
+        
+        block = buffer.block()
+        klines = {
+            name: block[np.newaxis, i] for i, name in enumerate(KlineBuffer.COLUMNS)
+        }
+        values = compute_kline_features(klines, names=('market_structure',))
+        trend = float(values['market_structure'][0])
         
-        return fvg_count
+        self._timeframe_trends[(symbol, timeframe)] = (buffer.generation, trend)
+        return trend
     
-    def _calculate_trend_alignment(self, klines: List[Dict]) -> float:
-        if len(klines) < 50:
-            return 0.0
+    def _higher_timeframe_trends(self, symbols: List[str]) -> np.ndarray:
+        timeframes = [
+            tf for tf in FEATURE_CONFIG["CONVERGENCE_TIMEFRAMES"] if tf != BASE_TIMEFRAME
+        ]
+        return np.array(
+            [[self._timeframe_trend(s, tf) for tf in timeframes] for s in symbols]
+        ).reshape(len(symbols), len(timeframes))
+    
+    def add_trade(self, symbol: str, trade_data: Dict[str, Any]):
+        self._append_trade(
+            symbol,
+            trade_data.get('T', 0),
+            float(trade_data.get('p', 0)),
+            float(trade_data.get('q', 0)),
+            bool(trade_data.get('m', False)),
+        )
+    
+    def add_trade_record(self, record: TradeRecord):
+        self._append_trade(
+            record.symbol,
+            record.trade_time,
+            record.price,
+            record.quantity,
+            record.is_buyer_maker,
+        )
+    
+    def _append_trade(self,
+                      symbol: str,
+                      timestamp: float,
+                      price: float,
+                      quantity: float,
+                      is_buyer_maker: bool):
+        if symbol not in self.trade_buffers:
+            self.trade_buffers[symbol] = TradeBuffer(
+                FEATURE_CONFIG["ORDER_FLOW_WINDOW"]
+            )
+            self.flow_windows[symbol] = {
+                seconds: TimeWindowFlow(seconds)
+                for seconds in FEATURE_CONFIG["ORDER_FLOW_TIME_WINDOWS"]
+            }
         
-        short_ma = np.mean([k['close'] for k in klines[-10:]])
-        medium_ma = np.mean([k['close'] for k in klines[-25:]])
-        long_ma = np.mean([k['close'] for k in klines[-50:]])
+        self.trade_buffers[symbol].append(
+            timestamp, price, quantity, 1.0 if is_buyer_maker else 0.0
+        )
         
-        if short_ma > medium_ma > long_ma:
-            return 1.0
-        elif short_ma < medium_ma < long_ma:
-            return -1.0
-        else:
-            return 0.0
+        for flow in self.flow_windows[symbol].values():
+            flow.add(timestamp, quantity, is_buyer_maker)
     
-    def _calculate_swing_distance(self, klines: List[Dict], swing_type: str) -> float:
-        if len(klines) < 20:
-            return 0.0
+    def export_state(self) -> Dict[str, np.ndarray]:
+        arrays = {}
+        for symbol, buffer in self.kline_buffers.items():
+            arrays[f"{symbol}/klines/{BASE_TIMEFRAME}"] = np.array(buffer.block())
+            for timeframe, resampled in self.timeframe_buffers[symbol].items():
+                arrays[f"{symbol}/klines/{timeframe}"] = np.array(resampled.block())
+        for symbol, buffer in self.trade_buffers.items():
+            arrays[f"{symbol}/trades"] = np.array(buffer.block())
+        return arrays
+    
+    def import_state(self, arrays: Dict[str, np.ndarray]):
+        # base klines first so resamplers are primed before higher timeframes merge
+        for key in sorted(arrays, key=lambda k: not k.endswith(f"/{BASE_TIMEFRAME}")):
+            symbol, kind, *timeframe = key.split('/')
+            rows = [tuple(float(v) for v in row) for row in np.asarray(arrays[key]).T]
+            
+            if kind == 'klines':
+                self._merge_bars(symbol, timeframe[0], rows)
+            elif kind == 'trades':
+                for timestamp, price, quantity, is_buyer_maker in rows:
+                    self._append_trade(symbol, timestamp, price, quantity, is_buyer_maker > 0)
+    
+    def calculate_features(self, symbol: str) -> Optional[Dict[str, Any]]:
+        if symbol not in self.kline_buffers or len(self.kline_buffers[symbol]) < 30:
+            return None
         
-        recent = klines[-20:]
-        current_price = recent[-1]['close']
+        generation = self._generation(symbol)
+        features = self._lookup_cache(symbol, generation)
+        if features is not None:
+            return features
         
-        if swing_type == 'high':
-            swing_point = max(k['high'] for k in recent)
+        if self.streaming and symbol in self.streaming_states:
+            features = self._streaming_features(symbol)
         else:
-            swing_point = min(k['low'] for k in recent)
+            block = self.kline_buffers[symbol].block()
+            klines = {
+                name: block[np.newaxis, i] for i, name in enumerate(KlineBuffer.COLUMNS)
+            }
+            
+            values = compute_kline_features(
+                klines, self._higher_timeframe_trends([symbol])
+            )
+            values['order_flow_value'] = np.array([self._calculate_order_flow(symbol)])
+            
+            features = {
+                name: values[name][0].item() for name in MODEL_CONFIG["FEATURE_NAMES"]
+            }
         
-        if swing_point == 0:
-            return 0.0
+        self._store_cache(symbol, generation, features)
         
-        return abs(current_price - swing_point) / swing_point
+        return features
     
-    def _calculate_structure_integrity(self, klines: List[Dict]) -> float:
-        if len(klines) < 30:
-            return 0.0
-        
-        trend = self._calculate_market_structure(klines)
-        
-        recent = klines[-30:]
-        breaks = 0
-        
-        for i in range(10, len(recent)):
-            if trend > 0:
-                if recent[i]['low'] < min(k['low'] for k in recent[i-10:i]):
-                    breaks += 1
+    def calculate_features_batch(self, symbols: List[str]) -> Tuple[List[str], np.ndarray]:
+        feature_names = MODEL_CONFIG["FEATURE_NAMES"]
+        rows: Dict[str, np.ndarray] = {}
+        groups: Dict[int, List[str]] = {}
+        
+        for symbol in symbols:
+            buffer = self.kline_buffers.get(symbol)
+            if buffer is None or len(buffer) < 30:
+                continue
+            
+            generation = self._generation(symbol)
+            features = self._lookup_cache(symbol, generation)
+            if features is None and self.streaming and symbol in self.streaming_states:
+                features = self._streaming_features(symbol)
+                self._store_cache(symbol, generation, features)
+            
+            if features is not None:
+                rows[symbol] = np.array([float(features[name]) for name in feature_names])
             else:
-                if recent[i]['high'] > max(k['high'] for k in recent[i-10:i]):
-                    breaks += 1
+                groups.setdefault(min(len(buffer), FULL_WINDOW_BARS), []).append(symbol)
         
-        return max(0.0, 1.0 - (breaks / 10))
-    
-    def _calculate_institutional_participation(self, klines: List[Dict]) -> float:
-        if len(klines) < 20:
-            return 0.0
+        for bars, group in groups.items():
+            blocks = np.stack([self.kline_buffers[s].block(bars) for s in group])
+            klines = {
+                name: blocks[:, i] for i, name in enumerate(KlineBuffer.COLUMNS)
+            }
+            
+            values = compute_kline_features(
+                klines, self._higher_timeframe_trends(group)
+            )
+            values['order_flow_value'] = np.array(
+                [self._calculate_order_flow(s) for s in group]
+            )
+            
+            matrix = np.column_stack([values[name] for name in feature_names])
+            for i, symbol in enumerate(group):
+                rows[symbol] = matrix[i].astype(np.float64)
+                self._store_cache(
+                    symbol,
+                    self._generation(symbol),
+                    {name: values[name][i].item() for name in feature_names}
+                )
         
-        recent = klines[-20:]
-        avg_volume = np.mean([k['volume'] for k in recent])
+        ready = [symbol for symbol in symbols if symbol in rows]
+        if not ready:
+            return [], np.empty((0, len(feature_names)))
         
-        high_volume_candles = sum(
-            1 for k in recent if k['volume'] > avg_volume * 1.5
-        )
+        return ready, np.vstack([rows[symbol] for symbol in ready])
+    
+    def _streaming_features(self, symbol: str) -> Dict[str, Any]:
+        features = self.streaming_states[symbol].features()
+        features['order_flow_value'] = self._calculate_order_flow(symbol)
         
-        return high_volume_candles / len(recent)
+        trends = np.column_stack([
+            [features['market_structure_trend']],
+            self._higher_timeframe_trends([symbol]),
+        ])
+        features['timeframe_convergence'] = float(converge(trends)[0])
+        return {name: features[name] for name in MODEL_CONFIG["FEATURE_NAMES"]}
     
-    def _calculate_timeframe_convergence(self, klines: List[Dict]) -> float:
-        if len(klines) < 60:
-            return 0.0
+    def _lookup_cache(self, symbol: str, generation: int) -> Optional[Dict[str, Any]]:
+        entry = self.cache_state.get(symbol)
         
-        tf1_trend = self._calculate_market_structure(klines[-15:])
-        tf2_trend = self._calculate_market_structure(klines[-30:])
-        tf3_trend = self._calculate_market_structure(klines[-60:])
+        if (entry is None or entry[0] != generation or
+                time.time() - entry[1] >= FEATURE_CONFIG["FEATURE_CACHE_TTL"]):
+            self.cache_misses += 1
+            return None
         
-        trends = [tf1_trend, tf2_trend, tf3_trend]
+        self.cache_hits += 1
         
-        if all(t > 0 for t in trends):
-            return 1.0
-        elif all(t < 0 for t in trends):
-            return -1.0
-        else:
-            return 0.0
+        # kline features only change with a new bar; order flow moves every tick
+        features = dict(self.feature_cache[symbol])
+        features['order_flow_value'] = self._calculate_order_flow(symbol)
+        self.feature_cache[symbol] = features
+        return features
+    
+    def _store_cache(self, symbol: str, generation: int, features: Dict[str, Any]):
+        self.feature_cache[symbol] = features
+        self.cache_state[symbol] = (generation, time.time())
     
-    def _calculate_liquidity_context(self, klines: List[Dict]) -> float:
-        if len(klines) < 30:
+    def get_cache_stats(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / lookups if lookups else 0.0,
+            'cached_symbols': len(self.cache_state),
+        }
+    
+    def _calculate_order_flow(self, symbol: str) -> float:
+        if symbol not in self.trade_buffers or len(self.trade_buffers[symbol]) < 100:
             return 0.0
         
-        recent = klines[-30:]
-        
-        avg_range = np.mean([k['high'] - k['low'] for k in recent])
-        latest_range = recent[-1]['high'] - recent[-1]['low']
+        trades = self.trade_buffers[symbol]
+        return order_flow_imbalance(trades.buy_volume, trades.sell_volume)
+    
+    def get_order_flow(self, symbol: str, window_seconds: Optional[int] = None,
+                       now_ms: Optional[float] = None) -> float:
+        if window_seconds is None:
+            return self._calculate_order_flow(symbol)
         
-        if avg_range == 0:
+        flow = self.flow_windows.get(symbol, {}).get(window_seconds)
+        if flow is None:
             return 0.0
-        
-        return latest_range / avg_range
+        return flow.imbalance(now_ms)
     
     def get_cached_features(self, symbol: str) -> Optional[Dict[str, Any]]:
         return self.feature_cache.get(symbol)
@@ -0,0 +1,281 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Optional, Sequence
+
+from config import FEATURE_CONFIG
+from core.feature_registry import FeatureRegistry
+
+# Every node takes kline columns shaped (symbols, bars) and returns one value
+# per symbol. All rows in a batch share the same bar count, so the length
+# guards of the single-symbol features apply to the whole batch at once.
+
+Klines = Dict[str, np.ndarray]
+
+KLINE_FEATURES = FeatureRegistry(
+    inputs=(
+        'timestamp', 'open', 'high', 'low', 'close', 'volume',
+        'bars', 'symbols', 'timeframe_trends',
+    )
+)
+
+
+def _rolling_prior(values: np.ndarray, lookback: int) -> np.ndarray:
+    # windows[:, j] holds the `lookback` values before values[:, j + lookback]
+    return sliding_window_view(values, lookback, axis=1)[:, :-1]
+
+
+def _prefix_sum(values: np.ndarray) -> np.ndarray:
+    return np.concatenate(
+        (np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)), axis=1
+    )
+
+
+def _window_mean(prefix: np.ndarray, start: int, stop=None) -> np.ndarray:
+    begin, end, _ = slice(start, stop).indices(prefix.shape[1] - 1)
+    return (prefix[:, end] - prefix[:, begin]) / (end - begin)
+
+
+def _structure_trend(breakouts, length: int) -> np.ndarray:
+    higher_high_flags, lower_low_flags = breakouts
+    first = max(higher_high_flags.shape[1] - (length - 10), 0)
+
+    higher_highs = np.count_nonzero(higher_high_flags[:, first:], axis=1)
+    lower_lows = np.count_nonzero(lower_low_flags[:, first:], axis=1)
+
+    return np.where(
+        higher_highs > lower_lows,
+        np.minimum(higher_highs / length * 2, 1.0),
+        np.maximum(-lower_lows / length * 2, -1.0),
+    )
+
+
+@KLINE_FEATURES.intermediate('body', requires=('open', 'close'))
+def body(open_, close):
+    return np.abs(close - open_)
+
+
+@KLINE_FEATURES.intermediate('range', requires=('high', 'low'))
+def bar_range(high, low):
+    return high - low
+
+
+@KLINE_FEATURES.intermediate('body_ratio', requires=('body', 'range'))
+def body_ratio(body_size, range_size):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(range_size > 0, body_size / range_size, 0.0)
+
+
+@KLINE_FEATURES.intermediate('volume_prefix', requires=('volume',))
+def volume_prefix(volume):
+    return _prefix_sum(volume)
+
+
+@KLINE_FEATURES.intermediate('close_prefix', requires=('close',))
+def close_prefix(close):
+    return _prefix_sum(close)
+
+
+@KLINE_FEATURES.intermediate('range_prefix', requires=('range',))
+def range_prefix(range_size):
+    return _prefix_sum(range_size)
+
+
+@KLINE_FEATURES.intermediate('close_breakouts', requires=('close',))
+def close_breakouts(close):
+    closes = close[:, -50:]
+    if closes.shape[1] < 10:
+        empty = np.zeros((closes.shape[0], 0), dtype=bool)
+        return empty, empty
+
+    prior = _rolling_prior(closes, 10)
+    return closes[:, 10:] > prior.max(axis=2), closes[:, 10:] < prior.min(axis=2)
+
+
+@KLINE_FEATURES.intermediate('market_structure', requires=('bars', 'symbols', 'close_breakouts'))
+def market_structure(bars, symbols, breakouts):
+    if bars < 10:
+        return np.zeros(symbols)
+    return _structure_trend(breakouts, min(50, bars))
+
+
+@KLINE_FEATURES.feature('market_structure_trend', requires=('market_structure',))
+def market_structure_trend(trend):
+    return trend
+
+
+@KLINE_FEATURES.feature(
+    'order_blocks_count',
+    requires=('bars', 'symbols', 'volume', 'body_ratio', 'volume_prefix')
+)
+def order_blocks(bars, symbols, volume, ratio, prefix):
+    window = FEATURE_CONFIG["ORDER_BLOCKS_WINDOW"]
+    if bars < window:
+        return np.zeros(symbols, dtype=np.int64)
+
+    offset = bars - window
+    idx = np.arange(3, window)
+    start = np.maximum(0, idx - 10)
+    avg_volume = (prefix[:, offset + idx] - prefix[:, offset + start]) / (idx - start)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = volume[:, offset + 3:] / avg_volume
+    large_body = ratio[:, offset + 3:] > 0.7
+
+    return np.count_nonzero(large_body & (volume_ratio > 1.5), axis=1)
+
+
+@KLINE_FEATURES.feature(
+    'institutional_candle',
+    requires=('bars', 'symbols', 'volume', 'body_ratio', 'volume_prefix')
+)
+def institutional_candle(bars, symbols, volume, ratio, prefix):
+    if bars < 5:
+        return np.zeros(symbols, dtype=bool)
+
+    avg_volume = _window_mean(prefix, -20, -1)
+
+    is_large_body = ratio[:, -1] > 0.8
+    is_high_volume = volume[:, -1] > avg_volume * 2
+
+    return is_large_body & is_high_volume
+
+
+@KLINE_FEATURES.feature('liquidity_grab', requires=('bars', 'symbols', 'high', 'low', 'close'))
+def liquidity_grab(bars, symbols, high, low, close):
+    if bars < 10:
+        return np.zeros(symbols, dtype=bool)
+
+    prev_high = high[:, -10:-1].max(axis=1)
+    prev_low = low[:, -10:-1].min(axis=1)
+
+    grabbed_high = (high[:, -1] > prev_high) & (close[:, -1] < prev_high)
+    grabbed_low = (low[:, -1] < prev_low) & (close[:, -1] > prev_low)
+
+    return grabbed_high | grabbed_low
+
+
+@KLINE_FEATURES.feature('fvg_count', requires=('bars', 'symbols', 'high', 'low'))
+def fair_value_gaps(bars, symbols, high, low):
+    window = FEATURE_CONFIG["FVG_WINDOW"]
+    if bars < window:
+        return np.zeros(symbols, dtype=np.int64)
+
+    highs = high[:, -window:]
+    lows = low[:, -window:]
+
+    gap_up = lows[:, 2:] > highs[:, :-2]
+    gap_down = highs[:, 2:] < lows[:, :-2]
+
+    return np.count_nonzero(gap_up | gap_down, axis=1)
+
+
+@KLINE_FEATURES.feature('trend_alignment', requires=('bars', 'symbols', 'close_prefix'))
+def trend_alignment(bars, symbols, prefix):
+    if bars < 50:
+        return np.zeros(symbols)
+
+    short_ma = _window_mean(prefix, -10)
+    medium_ma = _window_mean(prefix, -25)
+    long_ma = _window_mean(prefix, -50)
+
+    bullish = (short_ma > medium_ma) & (medium_ma > long_ma)
+    bearish = (short_ma < medium_ma) & (medium_ma < long_ma)
+
+    return np.where(bullish, 1.0, np.where(bearish, -1.0, 0.0))
+
+
+@KLINE_FEATURES.feature('swing_high_distance', requires=('bars', 'symbols', 'high', 'close'))
+def swing_high_distance(bars, symbols, high, close):
+    if bars < 20:
+        return np.zeros(symbols)
+
+    swing_point = high[:, -20:].max(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distance = np.abs(close[:, -1] - swing_point) / swing_point
+
+    return np.where(swing_point == 0, 0.0, distance)
+
+
+@KLINE_FEATURES.feature(
+    'structure_integrity',
+    requires=('bars', 'symbols', 'high', 'low', 'market_structure')
+)
+def structure_integrity(bars, symbols, high, low, trend):
+    if bars < 30:
+        return np.zeros(symbols)
+
+    lows = low[:, -30:]
+    highs = high[:, -30:]
+    low_breaks = np.count_nonzero(
+        lows[:, 10:] < _rolling_prior(lows, 10).min(axis=2), axis=1
+    )
+    high_breaks = np.count_nonzero(
+        highs[:, 10:] > _rolling_prior(highs, 10).max(axis=2), axis=1
+    )
+    breaks = np.where(trend > 0, low_breaks, high_breaks)
+
+    return np.maximum(0.0, 1.0 - breaks / 10)
+
+
+@KLINE_FEATURES.feature(
+    'institutional_participation',
+    requires=('bars', 'symbols', 'volume', 'volume_prefix')
+)
+def institutional_participation(bars, symbols, volume, prefix):
+    if bars < 20:
+        return np.zeros(symbols)
+
+    avg_volume = _window_mean(prefix, -20)[:, np.newaxis]
+
+    return np.count_nonzero(volume[:, -20:] > avg_volume * 1.5, axis=1) / 20
+
+
+def converge(trends: np.ndarray) -> np.ndarray:
+    # trends is (symbols, timeframes); NaN marks a timeframe without enough bars
+    ready = ~np.isnan(trends).any(axis=1)
+    with np.errstate(invalid='ignore'):
+        bullish = ready & np.all(trends > 0, axis=1)
+        bearish = ready & np.all(trends < 0, axis=1)
+    return np.where(bullish, 1.0, np.where(bearish, -1.0, 0.0))
+
+
+@KLINE_FEATURES.feature(
+    'timeframe_convergence',
+    requires=('market_structure', 'timeframe_trends')
+)
+def timeframe_convergence(trend, timeframe_trends):
+    return converge(np.column_stack([trend, timeframe_trends]))
+
+
+@KLINE_FEATURES.feature('liquidity_context', requires=('bars', 'symbols', 'range', 'range_prefix'))
+def liquidity_context(bars, symbols, range_size, prefix):
+    if bars < 30:
+        return np.zeros(symbols)
+
+    avg_range = _window_mean(prefix, -30)
+    latest_range = range_size[:, -1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        context = latest_range / avg_range
+
+    return np.where(avg_range == 0, 0.0, context)
+
+
+# bars needed before every feature runs on its full, fixed-size window
+FULL_WINDOW_BARS = max(
+    50, FEATURE_CONFIG["ORDER_BLOCKS_WINDOW"], FEATURE_CONFIG["FVG_WINDOW"]
+)
+
+
+def compute_kline_features(klines: Klines,
+                           timeframe_trends: Optional[np.ndarray] = None,
+                           names: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    symbols, bars = klines['close'].shape
+    if timeframe_trends is None:
+        timeframe_trends = np.empty((symbols, 0))
+
+    return KLINE_FEATURES.compute(
+        dict(klines, bars=bars, symbols=symbols, timeframe_trends=timeframe_trends),
+        names
+    )
@@ -0,0 +1,55 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class FeatureRegistry:
+    """Declarative DAG of features and the shared intermediates they depend on.
+
+    Nodes may only require inputs or nodes that are already registered, so
+    registration order is a valid evaluation order and cycles cannot occur.
+    """
+
+    def __init__(self, inputs: Sequence[str]):
+        self.inputs = tuple(inputs)
+        self.nodes: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+        self.features: List[str] = []
+
+    def _register(self, name: str, requires: Sequence[str], is_feature: bool):
+        def decorator(func: Callable) -> Callable:
+            if name in self.nodes or name in self.inputs:
+                raise ValueError(f"duplicate feature node: {name}")
+
+            missing = [r for r in requires if r not in self.nodes and r not in self.inputs]
+            if missing:
+                raise ValueError(f"{name} requires unknown nodes: {missing}")
+
+            self.nodes[name] = (func, tuple(requires))
+            if is_feature:
+                self.features.append(name)
+            return func
+        return decorator
+
+    def intermediate(self, name: str, requires: Sequence[str]):
+        return self._register(name, requires, is_feature=False)
+
+    def feature(self, name: str, requires: Sequence[str]):
+        return self._register(name, requires, is_feature=True)
+
+    def compute(self,
+                inputs: Dict[str, Any],
+                names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        context = FeatureContext(self, inputs)
+        return {name: context.get(name) for name in (names or self.features)}
+
+
+class FeatureContext:
+    """Evaluation of one registry over one set of inputs; every node runs at most once."""
+
+    def __init__(self, registry: FeatureRegistry, inputs: Dict[str, Any]):
+        self.registry = registry
+        self.values: Dict[str, Any] = dict(inputs)
+
+    def get(self, name: str) -> Any:
+        if name not in self.values:
+            func, requires = self.registry.nodes[name]
+            self.values[name] = func(*(self.get(r) for r in requires))
+        return self.values[name]
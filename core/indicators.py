@@ -0,0 +1,178 @@
+from typing import Dict, Optional
+
+from config import FEATURE_CONFIG
+
+# All indicators update in O(1) per closed bar and report None until they have
+# seen enough bars to be seeded.
+
+
+class WilderAverage:
+    """Wilder's smoothed moving average, seeded with the simple mean of the first ``period`` values."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.value: Optional[float] = None
+        self._seed_sum = 0.0
+        self._seed_count = 0
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self._seed_sum += x
+            self._seed_count += 1
+            if self._seed_count == self.period:
+                self.value = self._seed_sum / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + x) / self.period
+        return self.value
+
+
+class EMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value: Optional[float] = None
+        self._seed_sum = 0.0
+        self._seed_count = 0
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self._seed_sum += x
+            self._seed_count += 1
+            if self._seed_count == self.period:
+                self.value = self._seed_sum / self.period
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class RSI:
+    def __init__(self, period: int):
+        self.gains = WilderAverage(period)
+        self.losses = WilderAverage(period)
+        self.value: Optional[float] = None
+        self._prev_close: Optional[float] = None
+
+    def update(self, close: float) -> Optional[float]:
+        if self._prev_close is not None:
+            change = close - self._prev_close
+            avg_gain = self.gains.update(max(change, 0.0))
+            avg_loss = self.losses.update(max(-change, 0.0))
+
+            if avg_gain is not None:
+                if avg_loss == 0:
+                    self.value = 100.0 if avg_gain > 0 else 50.0
+                else:
+                    self.value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        self._prev_close = close
+        return self.value
+
+
+class MACD:
+    def __init__(self, fast: int, slow: int, signal: int):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.value: Optional[float] = None
+        self.signal_value: Optional[float] = None
+        self.histogram: Optional[float] = None
+
+    def update(self, close: float) -> Optional[float]:
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+
+        if fast is not None and slow is not None:
+            self.value = fast - slow
+            self.signal_value = self.signal.update(self.value)
+            if self.signal_value is not None:
+                self.histogram = self.value - self.signal_value
+        return self.value
+
+
+class ATR:
+    def __init__(self, period: int):
+        self.average = WilderAverage(period)
+        self.value: Optional[float] = None
+        self._prev_close: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        if self._prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(
+                high - low,
+                abs(high - self._prev_close),
+                abs(low - self._prev_close)
+            )
+        self._prev_close = close
+        self.value = self.average.update(true_range)
+        return self.value
+
+
+class ADX:
+    def __init__(self, period: int):
+        self.true_range = WilderAverage(period)
+        self.plus_dm = WilderAverage(period)
+        self.minus_dm = WilderAverage(period)
+        self.dx = WilderAverage(period)
+        self.value: Optional[float] = None
+        self.plus_di: Optional[float] = None
+        self.minus_di: Optional[float] = None
+        self._prev: Optional[tuple] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        if self._prev is not None:
+            prev_high, prev_low, prev_close = self._prev
+
+            up_move = high - prev_high
+            down_move = prev_low - low
+            plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+            minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+            atr = self.true_range.update(true_range)
+            plus = self.plus_dm.update(plus_dm)
+            minus = self.minus_dm.update(minus_dm)
+
+            if atr is not None:
+                self.plus_di = 100.0 * plus / atr if atr > 0 else 0.0
+                self.minus_di = 100.0 * minus / atr if atr > 0 else 0.0
+                di_sum = self.plus_di + self.minus_di
+                dx = 100.0 * abs(self.plus_di - self.minus_di) / di_sum if di_sum > 0 else 0.0
+                self.value = self.dx.update(dx)
+
+        self._prev = (high, low, close)
+        return self.value
+
+
+class IndicatorSet:
+    """RSI, MACD, ATR and ADX for one symbol, periods taken from FEATURE_CONFIG."""
+
+    def __init__(self):
+        self.rsi = RSI(FEATURE_CONFIG["RSI_PERIOD"])
+        self.macd = MACD(
+            FEATURE_CONFIG["MACD_FAST"],
+            FEATURE_CONFIG["MACD_SLOW"],
+            FEATURE_CONFIG["MACD_SIGNAL"]
+        )
+        self.atr = ATR(FEATURE_CONFIG["ATR_PERIOD"])
+        self.adx = ADX(FEATURE_CONFIG["ADX_PERIOD"])
+        self.bar_count = 0
+
+    def update(self, high: float, low: float, close: float):
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.atr.update(high, low, close)
+        self.adx.update(high, low, close)
+        self.bar_count += 1
+
+    def values(self) -> Dict[str, Optional[float]]:
+        return {
+            'rsi': self.rsi.value,
+            'macd': self.macd.value,
+            'macd_signal': self.macd.signal_value,
+            'macd_histogram': self.macd.histogram,
+            'atr': self.atr.value,
+            'adx': self.adx.value,
+            'plus_di': self.adx.plus_di,
+            'minus_di': self.adx.minus_di,
+        }
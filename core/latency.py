@@ -0,0 +1,56 @@
+import math
+import time
+from typing import Dict, Tuple
+
+from utils.histogram import LatencyHistogram
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# symbol key for metrics kept per stream type rather than per symbol
+ALL_SYMBOLS = '*'
+
+
+class LatencyTracker:
+    """Histograms keyed by (symbol, stream type, metric) plus rate-limited alerts."""
+
+    def __init__(self, window_seconds: float, warning_interval: float):
+        self.window_seconds = window_seconds
+        self.warning_interval = warning_interval
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self._last_warning: Dict[Tuple[str, str, str], float] = {}
+        self._suppressed: Dict[Tuple[str, str, str], int] = {}
+
+    def record(self, symbol: str, stream_type: str, metric: str, value: float):
+        key = (symbol, stream_type, metric)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram(self.window_seconds)
+        histogram.record(value)
+
+    def warn(self, symbol: str, stream_type: str, metric: str, value: float, limit: float):
+        key = (symbol, stream_type, metric)
+        now = time.monotonic()
+
+        if now - self._last_warning.get(key, -math.inf) < self.warning_interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+
+        logger.warning("high_websocket_latency",
+                      symbol=symbol,
+                      stream=stream_type,
+                      metric=metric,
+                      latency=value,
+                      limit=limit,
+                      suppressed=self._suppressed.pop(key, 0))
+        self._last_warning[key] = now
+
+    def get_stats(self) -> Dict[str, Dict[str, Dict[str, Dict[str, float]]]]:
+        now = time.time()
+        stats: Dict[str, Dict[str, Dict[str, Dict[str, float]]]] = {}
+        # the Flask thread reads while the event loop may be adding keys
+        for (symbol, stream_type, metric), histogram in list(self.histograms.items()):
+            stats.setdefault(symbol, {}).setdefault(stream_type, {})[metric] = (
+                histogram.summary(now=now)
+            )
+        return stats
@@ -0,0 +1,73 @@
+from bisect import bisect_left
+from itertools import islice
+from typing import Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class TimeIndexedBuffer(Generic[T]):
+    """Append-only message buffer bounded by count and by age.
+
+    Entries older than ``max_age`` (relative to the newest timestamp) and
+    entries beyond ``maxlen`` are expired from the head on every append, so
+    no periodic sweep is needed. Timestamps are kept non-decreasing, which
+    lets ``since`` find its starting point by binary search. Expired slots
+    are only compacted away once they make up half of the backing lists, so
+    every operation is amortised O(1) apart from the O(log n) search.
+    """
+
+    COMPACT_MIN = 256
+
+    def __init__(self, maxlen: int, max_age: float):
+        self.maxlen = maxlen
+        self.max_age = max_age
+        self._times: List[float] = []
+        self._items: List[T] = []
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+
+    def __iter__(self) -> Iterator[T]:
+        return islice(self._items, self._head, None)
+
+    def append(self, timestamp: float, item: T):
+        times = self._times
+        if times and timestamp < times[-1]:
+            # a clock step backwards must not break the ordering bisect relies on
+            timestamp = times[-1]
+        times.append(timestamp)
+        self._items.append(item)
+        self._expire(timestamp - self.max_age)
+
+    def extend(self, entries: Iterable[Tuple[float, T]]):
+        for timestamp, item in entries:
+            self.append(timestamp, item)
+
+    def _expire(self, cutoff: float):
+        times = self._times
+        head = self._head
+        end = len(times)
+
+        head = max(head, end - self.maxlen)
+        while head < end and times[head] < cutoff:
+            head += 1
+        self._head = head
+
+        if head >= self.COMPACT_MIN and head * 2 >= end:
+            del times[:head]
+            del self._items[:head]
+            self._head = 0
+
+    def since(self, timestamp: float) -> List[T]:
+        start = bisect_left(self._times, timestamp, lo=self._head)
+        return self._items[start:]
+
+    def latest(self, count: int = 1) -> List[T]:
+        start = max(self._head, len(self._items) - count)
+        return self._items[start:]
+
+    def clear(self):
+        self._times.clear()
+        self._items.clear()
+        self._head = 0
@@ -0,0 +1,138 @@
+import asyncio
+import zlib
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core.decoder import Message, is_closed_kline
+from core.order_book import merge_diffs
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Dispatch = Callable[[str, str, Message], Awaitable[None]]
+
+
+class _Partition:
+    def __init__(self):
+        self.entries: deque = deque()
+        self.latest: Dict[str, list] = {}
+        self.ready = asyncio.Event()
+
+
+class MessageQueue:
+    """Bounded hand-off between the socket readers and the message handlers.
+
+    Each symbol is pinned to one of ``workers`` partitions so its frames are
+    handled in arrival order while different symbols proceed in parallel.
+    ``put`` never blocks. When a partition is full a frame replaces the
+    still-queued frame of the same stream (trade ticks and in-progress kline
+    updates are conflated); depth diffs are merged into the queued diff so
+    the update-id sequence stays unbroken, closed klines are always
+    enqueued, and anything else is dropped.
+    """
+
+    def __init__(self, max_size: int, workers: int, batch_size: int):
+        self.workers = max(workers, 1)
+        self.partition_size = max(max_size // self.workers, 1)
+        self.batch_size = max(batch_size, 1)
+        self._partitions: List[_Partition] = []
+        self._tasks: List[asyncio.Task] = []
+        self.running = False
+
+        self.enqueued = 0
+        self.dispatched = 0
+        self.conflated = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def start(self, dispatch: Dispatch):
+        if self.running:
+            return
+        self.running = True
+        self._partitions = [_Partition() for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._worker(partition, dispatch))
+            for partition in self._partitions
+        ]
+
+    def _partition(self, symbol: str) -> _Partition:
+        return self._partitions[zlib.crc32(symbol.encode()) % self.workers]
+
+    def put(self, symbol: str, stream: str, data: Message) -> bool:
+        partition = self._partition(symbol)
+        critical = is_closed_kline(data)
+
+        if len(partition.entries) >= self.partition_size:
+            pending = partition.latest.get(stream)
+            if pending is not None and not critical:
+                if '@depth' in stream:
+                    data = dict(data, data=merge_diffs(pending[1]['data'], data['data']))
+                pending[1] = data
+                self.conflated += 1
+                return True
+            if not critical:
+                self.dropped += 1
+                return False
+
+        entry = [symbol, data, stream]
+        partition.entries.append(entry)
+        if not critical:
+            partition.latest[stream] = entry
+        self.enqueued += 1
+
+        depth = len(partition.entries)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        partition.ready.set()
+        return True
+
+    async def _worker(self, partition: _Partition, dispatch: Dispatch):
+        entries = partition.entries
+
+        while self.running:
+            if not entries:
+                partition.ready.clear()
+                await partition.ready.wait()
+                continue
+
+            for _ in range(min(self.batch_size, len(entries))):
+                entry = entries.popleft()
+                symbol, data, stream = entry
+                if partition.latest.get(stream) is entry:
+                    del partition.latest[stream]
+
+                try:
+                    await dispatch(symbol, stream, data)
+                except Exception as e:
+                    logger.error("message_dispatch_error",
+                               symbol=symbol,
+                               error=str(e))
+                self.dispatched += 1
+
+            # let the readers run between batches
+            await asyncio.sleep(0)
+
+    @property
+    def depth(self) -> int:
+        return sum(len(p.entries) for p in self._partitions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'capacity': self.partition_size * self.workers,
+            'enqueued': self.enqueued,
+            'dispatched': self.dispatched,
+            'conflated': self.conflated,
+            'dropped': self.dropped,
+        }
+
+    async def stop(self, timeout: Optional[float] = None):
+        self.running = False
+        for partition in self._partitions:
+            partition.ready.set()
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=timeout)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
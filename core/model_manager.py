@@ -177,6 +177,20 @@ class ModelManager:
             logger.error("prediction_failed", error=str(e))
             return 0, 0.5
     
+    def predict_batch(self, feature_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        count = len(feature_matrix)
+        if self.model is None or count == 0:
+            return np.zeros(count, dtype=int), np.full(count, 0.5)
+        
+        try:
+            predictions = self.model.predict(feature_matrix)
+            confidences = self.model.predict_proba(feature_matrix).max(axis=1)
+            
+            return predictions.astype(int), confidences.astype(float)
+        except Exception as e:
+            logger.error("batch_prediction_failed", error=str(e))
+            return np.zeros(count, dtype=int), np.full(count, 0.5)
+    
     def get_feature_importance(self) -> Dict[str, float]:
         return self.feature_importance
     
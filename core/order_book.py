@@ -0,0 +1,222 @@
+import asyncio
+from bisect import bisect_left, insort
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Level = Tuple[float, float]
+
+
+def merge_diffs(older: Dict[str, Any], newer: Dict[str, Any]) -> Dict[str, Any]:
+    """Folds two consecutive depth events into one covering ``older['U']..newer['u']``; newer quantities win."""
+    merged = dict(newer)
+    merged['U'] = older['U']
+    for side in ('b', 'a'):
+        levels = {price: quantity for price, quantity in older[side]}
+        levels.update((price, quantity) for price, quantity in newer[side])
+        merged[side] = [[price, quantity] for price, quantity in levels.items()]
+    return merged
+
+
+class BookSide:
+    """Up to ``max_levels`` price levels of one side, sorted so the best level is last."""
+
+    def __init__(self, is_bid: bool, max_levels: int = 500):
+        self.is_bid = is_bid
+        self.max_levels = max_levels
+        # asks are stored negated so both sides sort ascending towards the touch,
+        # which keeps the frequent updates near the touch at the cheap end of the list
+        self._sign = 1.0 if is_bid else -1.0
+        self._keys: List[float] = []
+        self.quantities: Dict[float, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def set(self, price: float, quantity: float):
+        key = price * self._sign
+        keys = self._keys
+        if quantity == 0:
+            if price in self.quantities:
+                del self.quantities[price]
+                del keys[bisect_left(keys, key)]
+            return
+
+        if price not in self.quantities:
+            if len(keys) >= self.max_levels and key < keys[0]:
+                # deeper than every level we keep
+                return
+            insort(keys, key)
+            if len(keys) > self.max_levels:
+                del self.quantities[keys.pop(0) * self._sign]
+        self.quantities[price] = quantity
+
+    def clear(self):
+        self._keys.clear()
+        self.quantities.clear()
+
+    def best(self) -> Optional[Level]:
+        if not self._keys:
+            return None
+        price = self._keys[-1] * self._sign
+        return price, self.quantities[price]
+
+    def top(self, n: int) -> List[Level]:
+        prices = [key * self._sign for key in self._keys[:-n - 1:-1]]
+        return [(price, self.quantities[price]) for price in prices]
+
+
+class LocalOrderBook:
+    """Order book for one symbol rebuilt from a REST snapshot plus depth diff events."""
+
+    MAX_PENDING = 1000
+
+    def __init__(self, symbol: str, max_levels: int = 500):
+        self.symbol = symbol
+        self.bids = BookSide(is_bid=True, max_levels=max_levels)
+        self.asks = BookSide(is_bid=False, max_levels=max_levels)
+        self.last_update_id: Optional[int] = None
+        self.synced = False
+        self.pending: List[Dict[str, Any]] = []
+        self.updated_at: Optional[int] = None
+
+    def _apply_levels(self, event: Dict[str, Any]):
+        for price, quantity in event['b']:
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in event['a']:
+            self.asks.set(float(price), float(quantity))
+        self.last_update_id = event['u']
+        self.updated_at = event.get('E')
+
+    def apply_snapshot(self, snapshot: Dict[str, Any]) -> bool:
+        self.bids.clear()
+        self.asks.clear()
+        for price, quantity in snapshot['bids']:
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in snapshot['asks']:
+            self.asks.set(float(price), float(quantity))
+        self.last_update_id = snapshot['lastUpdateId']
+
+        pending, self.pending = self.pending, []
+        pending = [event for event in pending if event['u'] > self.last_update_id]
+        if pending and pending[0]['U'] > self.last_update_id + 1:
+            # the snapshot is older than the first event we still hold
+            self.synced = False
+            self.pending = pending
+            return False
+
+        self.synced = True
+        for event in pending:
+            if not self.apply_diff(event):
+                return False
+        return True
+
+    def apply_diff(self, event: Dict[str, Any]) -> bool:
+        # diffs before the snapshot are held back; after it, each must continue the update-id sequence
+        if not self.synced:
+            self.pending.append(event)
+            if len(self.pending) > self.MAX_PENDING:
+                self.pending = self.pending[-self.MAX_PENDING:]
+            return False
+
+        if event['u'] <= self.last_update_id:
+            return True
+
+        if event['U'] > self.last_update_id + 1:
+            logger.warning("order_book_sequence_gap",
+                         symbol=self.symbol,
+                         last_update_id=self.last_update_id,
+                         first_update_id=event['U'])
+            self.synced = False
+            self.pending = [event]
+            return False
+
+        self._apply_levels(event)
+        return True
+
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best()
+
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def top(self, n: int = 10) -> Dict[str, List[Level]]:
+        return {'bids': self.bids.top(n), 'asks': self.asks.top(n)}
+
+    def imbalance(self, n: int = 10) -> float:
+        """(bid qty - ask qty) / (bid qty + ask qty) over the top ``n`` levels, in [-1, 1]."""
+        bid_quantity = sum(q for _, q in self.bids.top(n))
+        ask_quantity = sum(q for _, q in self.asks.top(n))
+        total = bid_quantity + ask_quantity
+        return (bid_quantity - ask_quantity) / total if total > 0 else 0.0
+
+    def liquidity(self, n: int = 10) -> Dict[str, float]:
+        """Quote notional resting in the top ``n`` levels of each side."""
+        return {
+            'bids': sum(p * q for p, q in self.bids.top(n)),
+            'asks': sum(p * q for p, q in self.asks.top(n)),
+        }
+
+
+class OrderBookManager:
+    """Keeps one LocalOrderBook per symbol in sync, fetching snapshots as needed."""
+
+    def __init__(self,
+                 fetch_snapshot: Callable[[str, int], Awaitable[Dict[str, Any]]],
+                 snapshot_depth: int = 100,
+                 max_levels: int = 500):
+        self.fetch_snapshot = fetch_snapshot
+        self.snapshot_depth = snapshot_depth
+        self.max_levels = max_levels
+        self.books: Dict[str, LocalOrderBook] = {}
+        self._syncing: Dict[str, asyncio.Task] = {}
+        self.resyncs = 0
+
+    def get(self, symbol: str) -> Optional[LocalOrderBook]:
+        book = self.books.get(symbol)
+        return book if book is not None and book.synced else None
+
+    def handle_diff(self, symbol: str, event: Dict[str, Any]):
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = LocalOrderBook(symbol, self.max_levels)
+
+        if not book.apply_diff(event) and symbol not in self._syncing:
+            self._syncing[symbol] = asyncio.create_task(self._sync(book))
+
+    async def _sync(self, book: LocalOrderBook):
+        try:
+            snapshot = await self.fetch_snapshot(book.symbol, self.snapshot_depth)
+            if book.apply_snapshot(snapshot):
+                logger.info("order_book_synced",
+                           symbol=book.symbol,
+                           last_update_id=book.last_update_id,
+                           levels=len(book.bids) + len(book.asks))
+                self.resyncs += 1
+        except Exception as e:
+            logger.warning("order_book_snapshot_failed",
+                         symbol=book.symbol,
+                         error=str(e))
+        finally:
+            del self._syncing[book.symbol]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'books': len(self.books),
+            'synced': sum(1 for book in self.books.values() if book.synced),
+            'resyncs': self.resyncs,
+        }
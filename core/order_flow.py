@@ -0,0 +1,67 @@
+import time
+from collections import deque
+from typing import Optional
+
+
+def order_flow_imbalance(buy_volume: float, sell_volume: float) -> float:
+    total_volume = buy_volume + sell_volume
+    if total_volume <= 0:
+        return 0.0
+    return (buy_volume - sell_volume) / total_volume
+
+
+class TimeWindowFlow:
+    """Buy/sell volume totals over a trailing time window.
+
+    Trades are aggregated into fixed-width time buckets; buckets are evicted
+    from the head as time advances, so adding a trade and reading the totals
+    are both amortized O(1) regardless of the tick rate.
+    """
+
+    def __init__(self, window_seconds: float, resolution_ms: int = 1000):
+        self.window_ms = int(window_seconds * 1000)
+        self.resolution_ms = resolution_ms
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self._buckets: deque = deque()
+        self._evictions = 0
+
+    def add(self, timestamp: float, quantity: float, is_buyer_maker: bool):
+        bucket_start = int(timestamp) // self.resolution_ms * self.resolution_ms
+        buckets = self._buckets
+
+        if not buckets or bucket_start > buckets[-1][0]:
+            buckets.append([bucket_start, 0.0, 0.0])
+        bucket = buckets[-1]
+
+        if is_buyer_maker:
+            bucket[2] += quantity
+            self.sell_volume += quantity
+        else:
+            bucket[1] += quantity
+            self.buy_volume += quantity
+
+        self.expire(timestamp)
+
+    def expire(self, now_ms: float):
+        cutoff = now_ms - self.window_ms
+        buckets = self._buckets
+
+        while buckets and buckets[0][0] + self.resolution_ms <= cutoff:
+            _, buy, sell = buckets.popleft()
+            self.buy_volume -= buy
+            self.sell_volume -= sell
+            self._evictions += 1
+
+        if not buckets:
+            self.buy_volume = 0.0
+            self.sell_volume = 0.0
+        elif self._evictions >= len(buckets):
+            self.buy_volume = sum(b[1] for b in buckets)
+            self.sell_volume = sum(b[2] for b in buckets)
+            self._evictions = 0
+
+    def imbalance(self, now_ms: Optional[float] = None) -> float:
+        # expire against the clock, not the last trade, so a quiet symbol decays to zero
+        self.expire(time.time() * 1000 if now_ms is None else now_ms)
+        return order_flow_imbalance(self.buy_volume, self.sell_volume)
@@ -0,0 +1,93 @@
+import time
+from typing import Any, Dict, Optional
+
+
+class PriceQuote:
+    __slots__ = ('last_price', 'last_updated', 'bid', 'bid_quantity',
+                 'ask', 'ask_quantity', 'book_updated')
+
+    def __init__(self):
+        self.last_price: Optional[float] = None
+        self.last_updated = 0.0
+        self.bid: Optional[float] = None
+        self.bid_quantity: Optional[float] = None
+        self.ask: Optional[float] = None
+        self.ask_quantity: Optional[float] = None
+        self.book_updated = 0.0
+
+    def mid(self) -> Optional[float]:
+        if self.bid is None or self.ask is None:
+            return None
+        return (self.bid + self.ask) / 2
+
+
+class PriceCache:
+    """Last trade price and best bid/ask per symbol, fed from the websocket.
+
+    Every value carries the local time it was received, and ``price`` only
+    answers when the newest of the trade price and the book mid is younger
+    than ``max_age`` seconds, so callers know when to fall back to REST.
+    """
+
+    def __init__(self, max_age: float = 5.0):
+        self.max_age = max_age
+        self.quotes: Dict[str, PriceQuote] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def _quote(self, symbol: str) -> PriceQuote:
+        quote = self.quotes.get(symbol)
+        if quote is None:
+            quote = self.quotes[symbol] = PriceQuote()
+        return quote
+
+    def update_trade(self, symbol: str, price: float, received_at: Optional[float] = None):
+        quote = self._quote(symbol)
+        quote.last_price = price
+        quote.last_updated = received_at or time.time()
+
+    def update_book_ticker(self, symbol: str, event: Dict[str, Any],
+                           received_at: Optional[float] = None):
+        quote = self._quote(symbol)
+        quote.bid = float(event['b'])
+        quote.bid_quantity = float(event['B'])
+        quote.ask = float(event['a'])
+        quote.ask_quantity = float(event['A'])
+        quote.book_updated = received_at or time.time()
+
+    def price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        quote = self.quotes.get(symbol)
+        if quote is not None:
+            cutoff = time.time() - (self.max_age if max_age is None else max_age)
+            if quote.last_updated >= quote.book_updated:
+                candidates = ((quote.last_updated, quote.last_price),
+                              (quote.book_updated, quote.mid()))
+            else:
+                candidates = ((quote.book_updated, quote.mid()),
+                              (quote.last_updated, quote.last_price))
+            for updated, price in candidates:
+                if price is not None and updated >= cutoff:
+                    self.hits += 1
+                    return price
+
+        self.misses += 1
+        return None
+
+    def get(self, symbol: str) -> Optional[PriceQuote]:
+        return self.quotes.get(symbol)
+
+    def age(self, symbol: str) -> Optional[float]:
+        quote = self.quotes.get(symbol)
+        if quote is None:
+            return None
+        return time.time() - max(quote.last_updated, quote.book_updated)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'symbols': len(self.quotes),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
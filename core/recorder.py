@@ -0,0 +1,155 @@
+import asyncio
+import glob
+import gzip
+import os
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple, Union
+
+from core.decoder import decode_frame
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FILE_PATTERN = "frames-*.tsv.gz"
+
+Frame = Tuple[float, bytes]
+
+
+class FrameRecorder:
+    """Appends ``<received_at>\\t<raw frame>`` lines to rotating multi-member gzip files."""
+
+    def __init__(self,
+                 directory: str,
+                 chunk_frames: int = 1000,
+                 max_file_bytes: int = 64 * 1024 * 1024,
+                 max_files: int = 24):
+        self.directory = directory
+        self.chunk_frames = chunk_frames
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+
+        # each full chunk becomes one gzip member, so a crash never corrupts earlier frames
+        self._chunk: List[bytes] = []
+        self._chunks: asyncio.Queue = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+        self._path: Optional[str] = None
+        self._file_seq = 0
+
+        self.frames_recorded = 0
+        self.bytes_written = 0
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_chunks())
+        logger.info("frame_recorder_started", directory=self.directory)
+
+    def record(self, received_at: float, raw: Union[str, bytes]):
+        if isinstance(raw, str):
+            raw = raw.encode()
+        self._chunk.append(b"%.6f\t%s\n" % (received_at, raw))
+        self.frames_recorded += 1
+
+        if len(self._chunk) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        if self._chunk:
+            self._chunks.put_nowait(b"".join(self._chunk))
+            self._chunk = []
+
+    async def _write_chunks(self):
+        while True:
+            chunk = await self._chunks.get()
+            try:
+                await asyncio.to_thread(self._write_chunk, chunk)
+            except Exception as e:
+                logger.error("frame_recorder_write_failed", error=str(e))
+            finally:
+                self._chunks.task_done()
+
+    def _write_chunk(self, chunk: bytes):
+        if self._path is None or os.path.getsize(self._path) >= self.max_file_bytes:
+            self._rotate()
+
+        compressed = gzip.compress(chunk, compresslevel=6)
+        with open(self._path, 'ab') as f:
+            f.write(compressed)
+        self.bytes_written += len(compressed)
+
+    def _rotate(self):
+        self._file_seq += 1
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        self._path = os.path.join(
+            self.directory, f"frames-{stamp}-{self._file_seq:04d}.tsv.gz"
+        )
+        open(self._path, 'ab').close()
+
+        for old in recording_files(self.directory)[:-self.max_files]:
+            os.remove(old)
+            logger.info("frame_recording_removed", path=old)
+
+    async def close(self):
+        self.flush()
+        if self._writer is not None:
+            await self._chunks.join()
+            self._writer.cancel()
+            self._writer = None
+        logger.info("frame_recorder_stopped",
+                   frames=self.frames_recorded,
+                   bytes_written=self.bytes_written)
+
+
+def recording_files(path: str) -> List[str]:
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, FILE_PATTERN)))
+    return [path]
+
+
+def read_frames(path: str) -> Iterator[Frame]:
+    """Yields ``(received_at, raw)`` from one recording file or every file in a directory, oldest first."""
+    for filename in recording_files(path):
+        with gzip.open(filename, 'rb') as f:
+            try:
+                for line in f:
+                    received_at, raw = line.rstrip(b"\n").split(b"\t", 1)
+                    yield float(received_at), raw
+            except EOFError:
+                # the last member of a file that was still being written
+                logger.warning("frame_recording_truncated", path=filename)
+
+
+async def replay_frames(manager,
+                        path: str,
+                        speed: Optional[float] = None) -> int:
+    """Feeds recorded frames through ``manager._dispatch_message``; ``speed`` None plays back-to-back."""
+    replayed = 0
+    first_recorded = None
+    started = time.monotonic()
+
+    for received_at, raw in read_frames(path):
+        if speed:
+            if first_recorded is None:
+                first_recorded = received_at
+            delay = (received_at - first_recorded) / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        # stamped with replay time so latency and price ages stay meaningful
+        stream, data = decode_frame(raw, time.time(), manager.fast_decode)
+        if stream is None:
+            continue
+
+        symbol = manager.stream_symbols.get(stream, stream.split('@', 1)[0].upper())
+        await manager._dispatch_message(symbol, stream, data)
+        replayed += 1
+
+        if not speed and replayed % 1000 == 0:
+            await asyncio.sleep(0)
+
+    logger.info("frame_replay_completed",
+               path=path,
+               frames=replayed,
+               duration=time.monotonic() - started)
+    return replayed
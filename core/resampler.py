@@ -0,0 +1,68 @@
+from typing import List, Optional, Tuple
+
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 180_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '30m': 1_800_000,
+    '1h': 3_600_000,
+    '4h': 14_400_000,
+    '1d': 86_400_000,
+}
+
+Bar = Tuple[float, float, float, float, float, float]
+
+
+class BarResampler:
+    """Builds higher-timeframe OHLCV bars incrementally from closed base bars.
+
+    Bars are ``(open_time, open, high, low, close, volume)`` tuples. A bucket is
+    emitted as soon as its last base bar arrives, or when a bar from a later
+    bucket shows up after missing minutes. A bucket that was first seen
+    mid-interval (e.g. right after startup) is dropped rather than emitted as
+    a partial bar.
+    """
+
+    def __init__(self, interval: str, base_interval: str = '1m'):
+        self.interval = interval
+        self.interval_ms = INTERVAL_MS[interval]
+        self.base_interval_ms = INTERVAL_MS[base_interval]
+        self._bucket: Optional[List[float]] = None
+        self._complete_start = False
+
+    def update(self, bar: Bar) -> List[Bar]:
+        timestamp, open_, high, low, close, volume = bar
+        bucket_start = int(timestamp) // self.interval_ms * self.interval_ms
+        completed: List[Bar] = []
+
+        if self._bucket is not None:
+            if bucket_start < self._bucket[0]:
+                return completed
+            if bucket_start > self._bucket[0]:
+                completed.extend(self._flush())
+
+        if self._bucket is None:
+            self._bucket = [bucket_start, open_, high, low, close, volume]
+            self._complete_start = int(timestamp) < bucket_start + self.base_interval_ms
+        else:
+            bucket = self._bucket
+            bucket[2] = max(bucket[2], high)
+            bucket[3] = min(bucket[3], low)
+            bucket[4] = close
+            bucket[5] += volume
+
+        if int(timestamp) + self.base_interval_ms >= bucket_start + self.interval_ms:
+            completed.extend(self._flush())
+
+        return completed
+
+    def mark_incomplete(self):
+        """Base bars went missing, so the open bucket must not be emitted as a full bar."""
+        self._complete_start = False
+
+    def _flush(self) -> List[Bar]:
+        bucket, complete = self._bucket, self._complete_start
+        self._bucket = None
+        self._complete_start = False
+        return [tuple(bucket)] if complete else []
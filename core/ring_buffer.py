@@ -0,0 +1,111 @@
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+
+class RingBuffer:
+    """Fixed-capacity columnar buffer backed by one preallocated float array.
+
+    Every row is written twice (at ``pos`` and ``pos + capacity``) so the most
+    recent ``n`` rows always form a contiguous slice and can be returned as
+    zero-copy views instead of being copied out of a deque.
+    """
+
+    COLUMNS: Sequence[str] = ()
+
+    def __init__(self, capacity: int, columns: Optional[Sequence[str]] = None):
+        self.columns = tuple(columns if columns is not None else self.COLUMNS)
+        self.capacity = capacity
+        self._column_index = {name: i for i, name in enumerate(self.columns)}
+        self._data = np.zeros((len(self.columns), 2 * capacity), dtype=np.float64)
+        self._pos = 0
+        self.count = 0
+        # bumped on every mutation and never reset, so readers can detect changes
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, *values: float):
+        pos = self._pos
+        self._data[:, pos] = values
+        self._data[:, pos + self.capacity] = values
+        self._pos = (pos + 1) % self.capacity
+        self.count += 1
+        self.generation += 1
+
+    def clear(self):
+        self._pos = 0
+        self.count = 0
+        self.generation += 1
+
+    def _slice(self, n: Optional[int]) -> np.ndarray:
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = (self._pos - 1) % self.capacity + self.capacity + 1
+        block = self._data[:, end - n:end]
+        block.flags.writeable = False
+        return block
+
+    def block(self, n: Optional[int] = None) -> np.ndarray:
+        return self._slice(n)
+
+    def view(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        block = self._slice(n)
+        return {name: block[i] for i, name in enumerate(self.columns)}
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        return self._slice(n)[self._column_index[name]]
+
+    def latest(self, name: str) -> float:
+        if self.count == 0:
+            raise IndexError("latest from empty buffer")
+        pos = (self._pos - 1) % self.capacity
+        return float(self._data[self._column_index[name], pos])
+
+
+class KlineBuffer(RingBuffer):
+    COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+class TradeBuffer(RingBuffer):
+    """Trade ticks plus running buy/sell volume totals over the buffered rows."""
+
+    COLUMNS = ('timestamp', 'price', 'quantity', 'is_buyer_maker')
+
+    def __init__(self, capacity: int, columns: Optional[Sequence[str]] = None):
+        super().__init__(capacity, columns)
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self._appends_since_resync = 0
+
+    def append(self, timestamp: float, price: float, quantity: float, is_buyer_maker: float):
+        if self.count >= self.capacity:
+            evicted_quantity = float(self._data[self._column_index['quantity'], self._pos])
+            if self._data[self._column_index['is_buyer_maker'], self._pos] > 0:
+                self.sell_volume -= evicted_quantity
+            else:
+                self.buy_volume -= evicted_quantity
+
+        super().append(timestamp, price, quantity, is_buyer_maker)
+
+        if is_buyer_maker > 0:
+            self.sell_volume += quantity
+        else:
+            self.buy_volume += quantity
+
+        self._appends_since_resync += 1
+        if self._appends_since_resync >= self.capacity:
+            self._resync()
+
+    def clear(self):
+        super().clear()
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self._appends_since_resync = 0
+
+    def _resync(self):
+        trades = self.view()
+        sell_mask = trades['is_buyer_maker'] > 0
+        self.buy_volume = float(trades['quantity'][~sell_mask].sum())
+        self.sell_volume = float(trades['quantity'][sell_mask].sum())
+        self._appends_since_resync = 0
@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+import time
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+HEADER_FILE = "header.json"
+EXTRA_FILE = "extra.json"
+
+
+def _array_filename(key: str) -> str:
+    return key.replace('/', '.') + ".npy"
+
+
+def write_snapshot(path: str,
+                   arrays: Dict[str, np.ndarray],
+                   extra: Optional[Dict[str, Any]] = None,
+                   created_at: Optional[float] = None):
+    """Writes one ``.npy`` file per array plus a JSON header, then swaps the directory in atomically."""
+    created_at = time.time() if created_at is None else created_at
+    staging = f"{path}.tmp"
+    previous = f"{path}.old"
+
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'created_at': created_at,
+        'arrays': {},
+    }
+    for key, array in arrays.items():
+        filename = _array_filename(key)
+        np.save(os.path.join(staging, filename), np.ascontiguousarray(array))
+        header['arrays'][key] = {
+            'file': filename,
+            'shape': list(array.shape),
+            'dtype': str(array.dtype),
+        }
+
+    if extra:
+        with open(os.path.join(staging, EXTRA_FILE), 'w') as f:
+            json.dump(extra, f)
+        header['extra'] = EXTRA_FILE
+
+    with open(os.path.join(staging, HEADER_FILE), 'w') as f:
+        json.dump(header, f)
+
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, previous)
+    os.replace(staging, path)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def read_snapshot(path: str,
+                  max_age: Optional[float] = None
+                  ) -> Optional[Tuple[float, Dict[str, np.ndarray], Dict[str, Any]]]:
+    """Returns ``(created_at, arrays, extra)`` with arrays memory-mapped, or None if missing or stale."""
+    header_path = os.path.join(path, HEADER_FILE)
+    if not os.path.exists(header_path):
+        return None
+
+    try:
+        with open(header_path) as f:
+            header = json.load(f)
+
+        if header.get('version') != SNAPSHOT_VERSION:
+            logger.warning("snapshot_version_mismatch",
+                         path=path,
+                         version=header.get('version'))
+            return None
+
+        created_at = header['created_at']
+        age = time.time() - created_at
+        if max_age is not None and age > max_age:
+            logger.info("snapshot_too_old", path=path, age=age, max_age=max_age)
+            return None
+
+        arrays = {
+            key: np.load(os.path.join(path, meta['file']), mmap_mode='r')
+            for key, meta in header['arrays'].items()
+        }
+
+    except Exception as e:
+        logger.error("snapshot_read_failed", path=path, error=str(e))
+        return None
+
+    # a bad extra file only costs the extras, never the arrays
+    extra = {}
+    if header.get('extra'):
+        try:
+            with open(os.path.join(path, header['extra'])) as f:
+                extra = json.load(f)
+        except Exception as e:
+            logger.warning("snapshot_extra_failed", path=path, error=str(e))
+
+    return created_at, arrays, extra
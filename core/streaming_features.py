@@ -0,0 +1,270 @@
+from collections import deque
+from typing import Dict, Any, Optional
+
+from config import FEATURE_CONFIG
+
+
+class RollingSum:
+    """Running sum over the last ``window`` values.
+
+    The total is recomputed from the stored values once per ``window`` pushes
+    so floating point drift from the add/subtract updates stays bounded.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self.total = 0.0
+        self._pushes = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def push(self, value: float):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+        self._pushes += 1
+        if self._pushes >= self.window:
+            self.total = sum(self.values)
+            self._pushes = 0
+
+    def mean(self) -> float:
+        return self.total / len(self.values) if self.values else 0.0
+
+
+class RollingExtreme:
+    """Rolling max (or min) over the last ``window`` values via a monotonic deque."""
+
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self._queue: deque = deque()
+        self._index = 0
+
+    def push(self, value: float):
+        queue = self._queue
+        if self.is_max:
+            while queue and queue[-1][1] <= value:
+                queue.pop()
+        else:
+            while queue and queue[-1][1] >= value:
+                queue.pop()
+        queue.append((self._index, value))
+
+        while queue[0][0] <= self._index - self.window:
+            queue.popleft()
+        self._index += 1
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._queue[0][1] if self._queue else None
+
+
+def _ratio_above(value: float, base: float, threshold: float) -> bool:
+    if base == 0:
+        return value > 0
+    return value / base > threshold
+
+
+class StreamingFeatureState:
+    """Per-symbol incremental state for the ICT/SMC kline features.
+
+    ``update`` is called once per closed bar and does a constant amount of
+    work; ``features`` then reads every single-timeframe kline feature in
+    O(1). Results match the full-window computation in ``FeatureEngine`` up
+    to float rounding.
+    """
+
+    STRUCTURE_LOOKBACK = 10
+    STRUCTURE_WINDOW = 50
+
+    def __init__(self):
+        lookback = self.STRUCTURE_LOOKBACK
+        self.bar_count = 0
+
+        self._close_max = RollingExtreme(lookback, 'max')
+        self._close_min = RollingExtreme(lookback, 'min')
+        self._low_min = RollingExtreme(lookback, 'min')
+        self._high_max = RollingExtreme(lookback, 'max')
+        self._grab_high = RollingExtreme(9, 'max')
+        self._grab_low = RollingExtreme(9, 'min')
+        self._swing_high = RollingExtreme(20, 'max')
+
+        # flags of the bars that have a full lookback inside the structure window
+        self._higher_highs = RollingSum(self.STRUCTURE_WINDOW - lookback)
+        self._lower_lows = RollingSum(self.STRUCTURE_WINDOW - lookback)
+        self._low_breaks = RollingSum(20)
+        self._high_breaks = RollingSum(20)
+
+        self._ob_window = FEATURE_CONFIG["ORDER_BLOCKS_WINDOW"]
+        self._ob_edge = min(lookback, self._ob_window)
+        self._ob_bars: deque = deque(maxlen=self._ob_window)
+        self._order_blocks = RollingSum(max(self._ob_window - self._ob_edge, 1))
+        self._volume_lookback = RollingSum(lookback)
+
+        self._fvg_flags = RollingSum(max(FEATURE_CONFIG["FVG_WINDOW"] - 2, 1))
+        self._prev_bars: deque = deque(maxlen=2)
+
+        self._closes = {w: RollingSum(w) for w in (10, 25, 50)}
+        self._volumes = RollingSum(20)
+        self._ranges = RollingSum(30)
+
+        self._latest: Dict[str, float] = {}
+        self._institutional_candle = False
+        self._liquidity_grab = False
+        self._participation = 0.0
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float):
+        lookback = self.STRUCTURE_LOOKBACK
+        has_lookback = self.bar_count >= lookback
+
+        higher_high = has_lookback and close > self._close_max.value
+        lower_low = has_lookback and close < self._close_min.value
+        self._higher_highs.push(1 if higher_high else 0)
+        self._lower_lows.push(1 if lower_low else 0)
+
+        if has_lookback:
+            self._low_breaks.push(1 if low < self._low_min.value else 0)
+            self._high_breaks.push(1 if high > self._high_max.value else 0)
+
+        if self.bar_count >= 9:
+            prev_high = self._grab_high.value
+            prev_low = self._grab_low.value
+            self._liquidity_grab = (
+                (high > prev_high and close < prev_high) or
+                (low < prev_low and close > prev_low)
+            )
+
+        body = abs(close - open_)
+        range_size = high - low
+        large_body = range_size > 0 and body / range_size > 0.7
+        if has_lookback:
+            is_block = large_body and _ratio_above(
+                volume, self._volume_lookback.mean(), 1.5
+            )
+            self._order_blocks.push(1 if is_block else 0)
+        self._ob_bars.append((large_body, volume))
+
+        if len(self._prev_bars) == 2:
+            before_high, before_low = self._prev_bars[0]
+            is_gap = low > before_high or high < before_low
+            self._fvg_flags.push(1 if is_gap else 0)
+        self._prev_bars.append((high, low))
+
+        self._volumes.push(volume)
+        prior_count = len(self._volumes) - 1
+        if prior_count > 0:
+            avg_volume = (self._volumes.total - volume) / prior_count
+            self._institutional_candle = (
+                range_size > 0 and body / range_size > 0.8 and
+                volume > avg_volume * 2
+            )
+
+        recent_volumes = self._volumes.values
+        threshold = self._volumes.mean() * 1.5
+        self._participation = (
+            sum(1 for v in recent_volumes if v > threshold) / len(recent_volumes)
+        )
+
+        for rolling in (self._close_max, self._close_min):
+            rolling.push(close)
+        self._low_min.push(low)
+        self._high_max.push(high)
+        self._grab_high.push(high)
+        self._grab_low.push(low)
+        self._swing_high.push(high)
+        self._volume_lookback.push(volume)
+        for rolling in self._closes.values():
+            rolling.push(close)
+        self._ranges.push(range_size)
+
+        self._latest = {'close': close, 'range': range_size}
+        self.bar_count += 1
+
+    def _market_structure_trend(self) -> float:
+        if self.bar_count < self.STRUCTURE_LOOKBACK:
+            return 0.0
+
+        length = min(self.STRUCTURE_WINDOW, self.bar_count)
+        higher_highs = int(self._higher_highs.total)
+        lower_lows = int(self._lower_lows.total)
+
+        if higher_highs > lower_lows:
+            return min(higher_highs / length * 2, 1.0)
+        else:
+            return max(-lower_lows / length * 2, -1.0)
+
+    def _order_blocks_count(self) -> int:
+        if self.bar_count < self._ob_window:
+            return 0
+
+        count = int(self._order_blocks.total) if self._ob_window > self._ob_edge else 0
+        bars = list(self._ob_bars)[:self._ob_edge]
+        for i in range(3, len(bars)):
+            large_body, volume = bars[i]
+            avg_volume = sum(v for _, v in bars[:i]) / i
+            if large_body and _ratio_above(volume, avg_volume, 1.5):
+                count += 1
+        return count
+
+    def _trend_alignment(self) -> float:
+        if self.bar_count < 50:
+            return 0.0
+
+        short_ma = self._closes[10].mean()
+        medium_ma = self._closes[25].mean()
+        long_ma = self._closes[50].mean()
+
+        if short_ma > medium_ma > long_ma:
+            return 1.0
+        elif short_ma < medium_ma < long_ma:
+            return -1.0
+        else:
+            return 0.0
+
+    def _swing_high_distance(self) -> float:
+        if self.bar_count < 20:
+            return 0.0
+
+        swing_point = self._swing_high.value
+        if swing_point == 0:
+            return 0.0
+        return abs(self._latest['close'] - swing_point) / swing_point
+
+    def _structure_integrity(self, trend: float) -> float:
+        if self.bar_count < 30:
+            return 0.0
+
+        breaks = self._low_breaks.total if trend > 0 else self._high_breaks.total
+        return max(0.0, 1.0 - (int(breaks) / 10))
+
+    def _liquidity_context(self) -> float:
+        if self.bar_count < 30:
+            return 0.0
+
+        avg_range = self._ranges.mean()
+        if avg_range == 0:
+            return 0.0
+        return self._latest['range'] / avg_range
+
+    def features(self) -> Dict[str, Any]:
+        trend = self._market_structure_trend()
+        fvg_ready = self.bar_count >= FEATURE_CONFIG["FVG_WINDOW"]
+
+        return {
+            'market_structure_trend': trend,
+            'order_blocks_count': self._order_blocks_count(),
+            'institutional_candle': self.bar_count >= 5 and self._institutional_candle,
+            'liquidity_grab': self.bar_count >= 10 and self._liquidity_grab,
+            'fvg_count': int(self._fvg_flags.total) if fvg_ready else 0,
+            'trend_alignment': self._trend_alignment(),
+            'swing_high_distance': self._swing_high_distance(),
+            'structure_integrity': self._structure_integrity(trend),
+            'institutional_participation': (
+                self._participation if self.bar_count >= 20 else 0.0
+            ),
+            'liquidity_context': self._liquidity_context(),
+        }
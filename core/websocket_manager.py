@@ -1,110 +1,207 @@
 import asyncio
-import json
+import os
 import time
-from collections import deque
 from typing import Dict, List, Callable, Any, Optional
-import websockets
-from websockets.exceptions import ConnectionClosed
 
-from config import BINANCE_CONFIG, WEBSOCKET_CONFIG
+from config import BINANCE_CONFIG, WEBSOCKET_CONFIG, SYSTEM_CONFIG
+from core.decoder import (JSON_BACKEND, Message, decode_frame, event_time,
+                          message_from_json, message_to_json, received_time)
+from core.latency import ALL_SYMBOLS, LatencyTracker
+from core.message_buffer import TimeIndexedBuffer
+from core.message_queue import MessageQueue
+from core.recorder import FrameRecorder, replay_frames
+from core.websocket_shard import WebSocketShard
 from utils.logger import get_logger
 from utils.circuit_breaker import CircuitBreaker
+from utils.clock_sync import ClockSync
 
 logger = get_logger(__name__)
 
 class WebSocketManager:
-    def __init__(self):
-        self.connections: Dict[str, Any] = {}
+    STREAM_TYPES = ('kline_1m', 'trade')
+    DEPTH_STREAM = 'depth@100ms'
+    BOOK_TICKER_STREAM = 'bookTicker'
+    
+    def __init__(self, clock: Optional[ClockSync] = None):
+        self.clock = clock or ClockSync()
+        self.stream_types = list(self.STREAM_TYPES)
+        if WEBSOCKET_CONFIG["ORDER_BOOK_ENABLED"]:
+            self.stream_types.append(self.DEPTH_STREAM)
+        if WEBSOCKET_CONFIG["BOOK_TICKER_ENABLED"]:
+            self.stream_types.append(self.BOOK_TICKER_STREAM)
+        self.shards: Dict[int, WebSocketShard] = {}
+        self.symbol_shards: Dict[str, int] = {}
+        self.stream_symbols: Dict[str, str] = {}
         self.message_handlers: Dict[str, List[Callable]] = {}
-        self.buffers: Dict[str, deque] = {}
+        self.buffers: Dict[str, TimeIndexedBuffer] = {}
         self.circuit_breaker = CircuitBreaker(
             failure_threshold=5,
             recovery_timeout=60
         )
         self.running = False
         self.latency_stats: Dict[str, float] = {}
-        
-    async def connect(self, symbols: List[str]):
-        self.running = True
+        self.latency = LatencyTracker(
+            WEBSOCKET_CONFIG["LATENCY_WINDOW"],
+            WEBSOCKET_CONFIG["LATENCY_WARNING_INTERVAL"]
+        )
+        self.fast_decode = WEBSOCKET_CONFIG["FAST_DECODE"]
+        self.recorder: Optional[FrameRecorder] = None
+        if WEBSOCKET_CONFIG["RECORDER_ENABLED"]:
+            self.recorder = FrameRecorder(
+                os.path.join(SYSTEM_CONFIG["DATA_PATH"], "recordings"),
+                chunk_frames=WEBSOCKET_CONFIG["RECORDER_CHUNK_FRAMES"],
+                max_file_bytes=WEBSOCKET_CONFIG["RECORDER_MAX_FILE_MB"] * 1024 * 1024,
+                max_files=WEBSOCKET_CONFIG["RECORDER_MAX_FILES"]
+            )
+        self.queue = MessageQueue(
+            WEBSOCKET_CONFIG["PROCESSING_QUEUE_SIZE"],
+            WEBSOCKET_CONFIG["PROCESSING_CONCURRENCY"],
+            WEBSOCKET_CONFIG["MESSAGE_BATCH_SIZE"]
+        )
         
         base_url = (BINANCE_CONFIG["WS_TESTNET_URL"] 
                    if BINANCE_CONFIG["TESTNET"] 
                    else BINANCE_CONFIG["WS_BASE_URL"])
+        self.base_url = base_url.replace('/ws', '/stream')
+        
+    async def connect(self, symbols: List[str]):
+        self.running = True
+        self.queue.start(self._dispatch_message)
+        if self.recorder:
+            self.recorder.start()
+        await self.subscribe(symbols)
+        logger.info("websocket_manager_started", 
+                   symbols=symbols, 
+                   shards=len(self.shards),
+                   json_backend=JSON_BACKEND)
+    
+    def _stream_names(self, symbol: str) -> List[str]:
+        return [f"{symbol.lower()}@{stream_type}" for stream_type in self.stream_types]
+    
+    def _assign_shard(self) -> WebSocketShard:
+        shard_size = WEBSOCKET_CONFIG["SHARD_SIZE"]
+        sizes = {shard_id: 0 for shard_id in self.shards}
+        for shard_id in self.symbol_shards.values():
+            sizes[shard_id] += 1
+        
+        open_shards = [shard_id for shard_id, size in sizes.items() if size < shard_size]
+        if open_shards:
+            return self.shards[min(open_shards, key=sizes.get)]
+        
+        if len(self.shards) < WEBSOCKET_CONFIG["MAX_SHARDS"]:
+            shard_id = max(self.shards, default=-1) + 1
+            shard = WebSocketShard(shard_id, self.base_url, self._handle_messages)
+            self.shards[shard_id] = shard
+            return shard
+        
+        # every shard is full: overfill the least loaded one rather than drop the symbol
+        shard_id = min(sizes, key=sizes.get)
+        logger.warning("websocket_shards_full", 
+                      shard=shard_id, 
+                      symbols=sizes[shard_id] + 1)
+        return self.shards[shard_id]
+    
+    async def subscribe(self, symbols: List[str]):
+        touched: Dict[int, WebSocketShard] = {}
         
         for symbol in symbols:
-            stream_name = f"{symbol.lower()}@kline_1m/{symbol.lower()}@trade"
-            url = f"{base_url.replace('/ws', '/stream')}?streams={stream_name}"
+            if symbol in self.symbol_shards:
+                continue
+            
+            shard = self._assign_shard()
+            streams = self._stream_names(symbol)
+            shard.streams.update(streams)
+            for stream in streams:
+                self.stream_symbols[stream] = symbol
+            self.symbol_shards[symbol] = shard.shard_id
             
-            asyncio.create_task(self._connect_stream(symbol, url))
-            logger.info("websocket_connecting", symbol=symbol, url=url)
+            if symbol not in self.buffers:
+                self.buffers[symbol] = self._new_buffer()
+            touched[shard.shard_id] = shard
         
-        logger.info("websocket_manager_started", symbols=symbols)
+        for shard in touched.values():
+            if shard.connected:
+                await shard.sync()
+            elif self.running:
+                shard.start()
+                logger.info("websocket_connecting", 
+                           shard=shard.shard_id, 
+                           streams=len(shard.streams))
     
-    async def _connect_stream(self, symbol: str, url: str):
-        reconnect_attempt = 0
+    async def unsubscribe(self, symbols: List[str]):
+        touched: Dict[int, WebSocketShard] = {}
         
-        while self.running:
-            try:
-                async with websockets.connect(
-                    url,
-                    ping_interval=WEBSOCKET_CONFIG["HEARTBEAT_INTERVAL"],
-                    ping_timeout=10
-                ) as websocket:
-                    self.connections[symbol] = websocket
-                    reconnect_attempt = 0
-                    logger.info("websocket_connected", symbol=symbol)
-                    
-                    await self._handle_messages(symbol, websocket)
-                    
-            except ConnectionClosed as e:
-                logger.warning("websocket_connection_closed", 
-                             symbol=symbol, 
-                             error=str(e))
-                await self._handle_reconnect(symbol, reconnect_attempt)
-                reconnect_attempt += 1
-                
-            except Exception as e:
-                logger.error("websocket_error", 
-                           symbol=symbol, 
-                           error=str(e))
-                await self._handle_reconnect(symbol, reconnect_attempt)
-                reconnect_attempt += 1
-    
-    async def _handle_messages(self, symbol: str, websocket):
-        if symbol not in self.buffers:
-            self.buffers[symbol] = deque(
-                maxlen=WEBSOCKET_CONFIG["BUFFER_SIZE"]
-            )
+        for symbol in symbols:
+            shard_id = self.symbol_shards.pop(symbol, None)
+            if shard_id is None:
+                continue
+            
+            shard = self.shards[shard_id]
+            for stream in self._stream_names(symbol):
+                shard.streams.discard(stream)
+                self.stream_symbols.pop(stream, None)
+            touched[shard_id] = shard
+        
+        for shard_id, shard in touched.items():
+            if shard.streams:
+                await shard.sync()
+            else:
+                await shard.close()
+                del self.shards[shard_id]
         
-        async for message in websocket:
-            try:
-                data = json.loads(message)
-                timestamp = time.time()
-                
-                data['received_at'] = timestamp
-                self.buffers[symbol].append(data)
-                
-                if 'stream' in data:
-                    latency = timestamp - (data.get('data', {}).get('E', timestamp * 1000) / 1000)
-                    self.latency_stats[symbol] = latency
-                    
-                    if latency > WEBSOCKET_CONFIG["MAX_LATENCY"]:
-                        logger.warning("high_websocket_latency", 
-                                     symbol=symbol, 
-                                     latency=latency)
-                
-                await self._dispatch_message(symbol, data)
-                
-            except json.JSONDecodeError as e:
-                logger.error("json_decode_error", 
-                           symbol=symbol, 
-                           error=str(e))
-            except Exception as e:
-                logger.error("message_handling_error", 
-                           symbol=symbol, 
-                           error=str(e))
-    
-    async def _dispatch_message(self, symbol: str, data: Dict[str, Any]):
+        logger.info("websocket_unsubscribed", symbols=symbols)
+    
+    async def _handle_messages(self, shard: WebSocketShard, message: str):
+        try:
+            timestamp = time.time()
+            if self.recorder:
+                self.recorder.record(timestamp, message)
+            
+            stream, data = decode_frame(message, timestamp, self.fast_decode)
+            
+            if stream is None:
+                if 'id' in data:
+                    logger.debug("websocket_request_ack", 
+                               shard=shard.shard_id, 
+                               response=data)
+                return
+            
+            symbol = self.stream_symbols.get(stream)
+            if symbol is None:
+                # frames still in flight for a stream we just unsubscribed
+                return
+            
+            self.buffers[symbol].append(timestamp, data)
+            
+            stream_type = stream.split('@', 1)[-1]
+            exchange_now = timestamp + self.clock.offset
+            latency = exchange_now - ((event_time(data) or exchange_now * 1000) / 1000)
+            self.latency_stats[symbol] = latency
+            self.latency.record(symbol, stream_type, 'exchange_to_receive', latency)
+            
+            if latency > WEBSOCKET_CONFIG["MAX_LATENCY"]:
+                self.latency.warn(symbol, stream_type, 'exchange_to_receive',
+                                  latency, WEBSOCKET_CONFIG["MAX_LATENCY"])
+            
+            # the read loop only enqueues; handlers run on the queue workers
+            self.queue.put(symbol, stream, data)
+            
+        except ValueError as e:
+            logger.error("json_decode_error", 
+                       shard=shard.shard_id, 
+                       error=str(e))
+        except Exception as e:
+            logger.error("message_handling_error", 
+                       shard=shard.shard_id, 
+                       error=str(e))
+    
+    async def _dispatch_message(self, symbol: str, stream: str, data: Message):
+        stream_type = stream.split('@', 1)[-1]
+        # queueing and handler time don't depend on the symbol, so one histogram per stream type
+        self.latency.record(ALL_SYMBOLS, stream_type, 'receive_to_dispatch',
+                            time.time() - received_time(data))
+        
+        started = time.perf_counter()
         if symbol in self.message_handlers:
             for handler in self.message_handlers[symbol]:
                 try:
@@ -116,17 +213,12 @@ class WebSocketManager:
                     logger.error("message_handler_error", 
                                symbol=symbol, 
                                error=str(e))
+        self.latency.record(ALL_SYMBOLS, stream_type, 'handler',
+                            time.perf_counter() - started)
     
-    async def _handle_reconnect(self, symbol: str, attempt: int):
-        delay = min(
-            WEBSOCKET_CONFIG["RECONNECT_DELAY"] * (2 ** attempt),
-            60
-        )
-        logger.info("websocket_reconnecting", 
-                   symbol=symbol, 
-                   attempt=attempt, 
-                   delay=delay)
-        await asyncio.sleep(delay)
+    async def replay(self, path: str, speed: Optional[float] = None) -> int:
+        """Dispatches recorded frames to the registered handlers instead of live ones."""
+        return await replay_frames(self, path, speed)
     
     def register_handler(self, symbol: str, handler: Callable):
         if symbol not in self.message_handlers:
@@ -134,35 +226,68 @@ class WebSocketManager:
         self.message_handlers[symbol].append(handler)
         logger.info("handler_registered", symbol=symbol)
     
-    def get_latest_data(self, symbol: str, count: int = 1) -> List[Dict[str, Any]]:
+    def get_latest_data(self, symbol: str, count: int = 1) -> List[Message]:
+        if symbol in self.buffers:
+            return self.buffers[symbol].latest(count)
+        return []
+    
+    def get_data_since(self, symbol: str, since: float) -> List[Message]:
         if symbol in self.buffers:
-            return list(self.buffers[symbol])[-count:]
+            return self.buffers[symbol].since(since)
         return []
     
+    def _new_buffer(self) -> TimeIndexedBuffer:
+        return TimeIndexedBuffer(
+            WEBSOCKET_CONFIG["BUFFER_SIZE"],
+            WEBSOCKET_CONFIG["BUFFER_MAX_AGE"]
+        )
+    
+    def export_buffers(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            symbol: [message_to_json(message) for message in buffer]
+            for symbol, buffer in self.buffers.items()
+        }
+    
+    def import_buffers(self, buffers: Dict[str, List[Dict[str, Any]]]):
+        # decode everything first so a bad entry leaves the live buffers untouched
+        decoded = {
+            symbol: [message_from_json(data) for data in messages]
+            for symbol, messages in buffers.items()
+        }
+        for symbol, messages in decoded.items():
+            restored = self._new_buffer()
+            for message in (*messages, *self.buffers.get(symbol, ())):
+                restored.append(received_time(message), message)
+            self.buffers[symbol] = restored
+    
     def get_latency(self, symbol: str) -> float:
         return self.latency_stats.get(symbol, 0.0)
     
-    async def cleanup_old_data(self):
-        while self.running:
-            await asyncio.sleep(WEBSOCKET_CONFIG["MEMORY_CLEANUP_INTERVAL"])
-            
-            cutoff = time.time() - 86400
-            for symbol in self.buffers:
-                old_size = len(self.buffers[symbol])
-                self.buffers[symbol] = deque(
-                    [d for d in self.buffers[symbol] 
-                     if d.get('received_at', 0) > cutoff],
-                    maxlen=WEBSOCKET_CONFIG["BUFFER_SIZE"]
-                )
-                cleaned = old_size - len(self.buffers[symbol])
-                if cleaned > 0:
-                    logger.debug("buffer_cleaned", 
-                               symbol=symbol, 
-                               cleaned_count=cleaned)
+    def get_latency_stats(self) -> Dict[str, Dict[str, Dict[str, Dict[str, float]]]]:
+        return self.latency.get_stats()
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        return self.queue.get_stats()
+    
+    @property
+    def reconnect_count(self) -> int:
+        return sum(shard.reconnects for shard in self.shards.values())
+    
+    def get_shard_stats(self) -> Dict[int, Dict[str, Any]]:
+        return {
+            shard_id: {
+                'connected': shard.connected,
+                'streams': len(shard.streams),
+                'reconnects': shard.reconnects,
+            }
+            for shard_id, shard in self.shards.items()
+        }
     
     async def close(self):
         self.running = False
-        for symbol, websocket in self.connections.items():
-            await websocket.close()
-            logger.info("websocket_closed", symbol=symbol)
+        for shard in self.shards.values():
+            await shard.close()
+        await self.queue.stop(timeout=5)
+        if self.recorder:
+            await self.recorder.close()
         logger.info("websocket_manager_stopped")
@@ -0,0 +1,141 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional, Set
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+from config import WEBSOCKET_CONFIG
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class WebSocketShard:
+    """One combined-stream connection carrying many ``<symbol>@<type>`` streams.
+
+    ``streams`` is the desired set; ``active`` is what the open connection is
+    currently subscribed to. ``sync`` sends SUBSCRIBE/UNSUBSCRIBE for the
+    difference, so streams can be added or removed without reconnecting. On
+    reconnect the URL is rebuilt from ``streams``.
+    """
+
+    def __init__(self,
+                 shard_id: int,
+                 base_url: str,
+                 on_message: Callable[['WebSocketShard', str], Awaitable[None]]):
+        self.shard_id = shard_id
+        self.base_url = base_url
+        self.on_message = on_message
+        self.streams: Set[str] = set()
+        self.active: Set[str] = set()
+        self.websocket = None
+        self.task: Optional[asyncio.Task] = None
+        self.running = False
+        self.reconnects = 0
+        self._request_id = 0
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}?streams={'/'.join(sorted(self.streams))}"
+
+    @property
+    def connected(self) -> bool:
+        return self.websocket is not None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.running = True
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        attempt = 0
+
+        while self.running and self.streams:
+            try:
+                streams = set(self.streams)
+                async with websockets.connect(
+                    self.url,
+                    ping_interval=WEBSOCKET_CONFIG["HEARTBEAT_INTERVAL"],
+                    ping_timeout=10
+                ) as websocket:
+                    self.websocket = websocket
+                    self.active = streams
+                    attempt = 0
+                    logger.info("websocket_shard_connected",
+                               shard=self.shard_id,
+                               streams=len(streams))
+
+                    # streams may have changed while the handshake was in flight
+                    await self.sync()
+
+                    async for message in websocket:
+                        await self.on_message(self, message)
+
+            except ConnectionClosed as e:
+                logger.warning("websocket_shard_closed",
+                             shard=self.shard_id,
+                             error=str(e))
+            except Exception as e:
+                logger.error("websocket_shard_error",
+                           shard=self.shard_id,
+                           error=str(e))
+            finally:
+                self.websocket = None
+                self.active = set()
+
+            if self.running and self.streams:
+                await self._backoff(attempt)
+                attempt += 1
+                self.reconnects += 1
+
+    async def _backoff(self, attempt: int):
+        delay = min(
+            WEBSOCKET_CONFIG["SHARD_RECONNECT_DELAY"] * (2 ** attempt),
+            60
+        )
+        logger.info("websocket_shard_reconnecting",
+                   shard=self.shard_id,
+                   attempt=attempt,
+                   delay=delay)
+        await asyncio.sleep(delay)
+
+    async def sync(self):
+        if self.websocket is None:
+            return
+
+        added = sorted(self.streams - self.active)
+        removed = sorted(self.active - self.streams)
+
+        # mark first so a concurrent sync does not resend the same streams
+        self.active.update(added)
+        self.active.difference_update(removed)
+
+        if added:
+            await self._send("SUBSCRIBE", added)
+        if removed:
+            await self._send("UNSUBSCRIBE", removed)
+
+    async def _send(self, method: str, params):
+        self._request_id += 1
+        await self.websocket.send(json.dumps({
+            'method': method,
+            'params': params,
+            'id': self._request_id,
+        }))
+        logger.info("websocket_shard_request",
+                   shard=self.shard_id,
+                   method=method,
+                   streams=len(params),
+                   request_id=self._request_id)
+
+    async def close(self):
+        self.running = False
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+        logger.info("websocket_shard_stopped", shard=self.shard_id)
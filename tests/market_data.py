@@ -0,0 +1,35 @@
+import random
+from typing import Any, Dict, List
+
+START_MS = 1_699_999_980_000
+BAR_MS = 60_000
+
+
+def make_klines(count: int, seed: int = 0, start: int = START_MS) -> List[Dict[str, Any]]:
+    """Closed 1m klines in the websocket ``k`` payload shape, as a seeded random walk."""
+    rng = random.Random(seed)
+    price = 100.0
+    klines = []
+    for i in range(count):
+        o = price
+        c = o * (1 + rng.gauss(0, 0.004))
+        h = max(o, c) * (1 + abs(rng.gauss(0, 0.002)))
+        l = min(o, c) * (1 - abs(rng.gauss(0, 0.002)))
+        v = rng.expovariate(1 / 10)
+        open_time = start + i * BAR_MS
+        klines.append({
+            't': open_time, 'T': open_time + BAR_MS - 1,
+            'o': str(o), 'h': str(h), 'l': str(l), 'c': str(c), 'v': str(v),
+            'x': True,
+        })
+        price = c
+    return klines
+
+
+def make_trades(count: int, seed: int = 0, start: int = START_MS) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {'T': start + i * 37, 'E': start + i * 37, 'p': str(100 + rng.random()),
+         'q': str(rng.expovariate(1)), 'm': rng.random() < 0.5}
+        for i in range(count)
+    ]
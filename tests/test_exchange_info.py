@@ -0,0 +1,101 @@
+import asyncio
+
+from trading.exchange_info import ExchangeInfoCache, SymbolFilters
+
+INFO = {
+    'symbol': 'BTCUSDT',
+    'status': 'TRADING',
+    'filters': [
+        {'filterType': 'PRICE_FILTER', 'minPrice': '0.01000000',
+         'maxPrice': '1000000.00000000', 'tickSize': '0.01000000'},
+        {'filterType': 'LOT_SIZE', 'minQty': '0.00001000',
+         'maxQty': '9000.00000000', 'stepSize': '0.00001000'},
+        {'filterType': 'MARKET_LOT_SIZE', 'minQty': '0.00000000',
+         'maxQty': '100.00000000', 'stepSize': '0.00000000'},
+        {'filterType': 'NOTIONAL', 'minNotional': '5.00000000', 'applyMinToMarket': True,
+         'maxNotional': '9000000.00000000', 'applyMaxToMarket': False},
+    ],
+}
+
+
+def test_steps_are_parsed_with_their_decimals():
+    filters = SymbolFilters(INFO)
+    assert filters.step_size == 0.00001
+    assert filters.quantity_decimals == 5
+    assert filters.price_decimals == 2
+    # a zero MARKET_LOT_SIZE step falls back to LOT_SIZE
+    assert filters.market_step_size is None
+    assert filters.market_max_qty == 100.0
+
+
+def test_round_quantity_floors_to_step():
+    filters = SymbolFilters(INFO)
+    assert filters.round_quantity(0.123456789) == 0.12345
+    assert filters.round_quantity(0.00001999) == 0.00001
+
+
+def test_round_quantity_keeps_exact_multiples():
+    filters = SymbolFilters(INFO)
+    # 0.3 / 0.00001 is 29999.999999999996 in floats
+    assert filters.round_quantity(0.3) == 0.3
+    assert filters.round_quantity(1.00001) == 1.00001
+
+
+def test_round_price_to_tick():
+    filters = SymbolFilters(INFO)
+    assert filters.round_price(35000.126) == 35000.13
+    assert filters.round_price(0.1 + 0.2) == 0.3
+
+
+def test_validate_accepts_rounded_order():
+    filters = SymbolFilters(INFO)
+    quantity = filters.round_quantity(0.0123456)
+    assert filters.validate(quantity, 35000.0) is None
+
+
+def test_validate_rejections():
+    filters = SymbolFilters(INFO)
+    assert 'below min' in filters.validate(0.000001, 35000.0)
+    assert 'above max' in filters.validate(150.0, 35000.0)
+    assert 'not a multiple of step' in filters.validate(0.000015, 35000.0)
+    assert 'notional' in filters.validate(0.0001, 35000.0)
+
+    # the market lot max does not bind limit orders
+    assert filters.validate(150.0, 35000.0, market=False) is None
+    assert 'not a multiple of tick' in filters.validate(0.01, 35000.005, market=False)
+    assert 'outside' in filters.validate(0.01, 0.001, market=False)
+
+
+def test_validate_rejects_symbols_not_trading():
+    filters = SymbolFilters(dict(INFO, status='BREAK'))
+    assert filters.validate(0.01, 35000.0) == 'symbol status BREAK'
+
+
+def test_legacy_min_notional_can_skip_market_orders():
+    info = dict(INFO, filters=INFO['filters'][:3] + [
+        {'filterType': 'MIN_NOTIONAL', 'minNotional': '10.00000000', 'applyToMarket': False},
+    ])
+    filters = SymbolFilters(info)
+    assert filters.validate(0.0001, 35000.0) is None
+    assert 'notional' in filters.validate(0.0001, 35000.0, market=False)
+
+
+def test_failed_refresh_keeps_previous_filters():
+    responses = [{'symbols': [INFO]}, RuntimeError('unavailable')]
+
+    async def fetch(symbols):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def run():
+        cache = ExchangeInfoCache(fetch)
+        assert await cache.load()
+        assert not await cache.load()
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.get('BTCUSDT') is not None
+    assert cache.consecutive_failures == 1
+    assert cache.get_stats()['refreshes'] == 1
@@ -0,0 +1,68 @@
+from core.message_buffer import TimeIndexedBuffer
+
+
+def _filled(count, maxlen=1000, max_age=1e9):
+    buffer = TimeIndexedBuffer(maxlen, max_age)
+    buffer.extend((float(i), i) for i in range(count))
+    return buffer
+
+
+def test_since_is_inclusive():
+    buffer = _filled(10)
+    assert buffer.since(7.0) == [7, 8, 9]
+
+
+def test_since_between_timestamps_starts_at_next_entry():
+    buffer = _filled(10)
+    assert buffer.since(6.5) == [7, 8, 9]
+
+
+def test_since_past_the_end_is_empty():
+    buffer = _filled(10)
+    assert buffer.since(100.0) == []
+
+
+def test_since_before_head_skips_expired_entries():
+    buffer = _filled(10, maxlen=4)
+    assert buffer.since(0.0) == [6, 7, 8, 9]
+    assert len(buffer) == 4
+
+
+def test_entries_expire_by_age_of_newest_timestamp():
+    buffer = _filled(10, max_age=3.0)
+    # an entry exactly max_age old is still kept
+    assert list(buffer) == [6, 7, 8, 9]
+    assert buffer.since(0.0) == [6, 7, 8, 9]
+
+
+def test_equal_timestamps_are_all_returned():
+    buffer = TimeIndexedBuffer(100, 60.0)
+    buffer.extend([(1.0, 'a'), (2.0, 'b'), (2.0, 'c'), (3.0, 'd')])
+    assert buffer.since(2.0) == ['b', 'c', 'd']
+
+
+def test_clock_step_backwards_keeps_order():
+    buffer = TimeIndexedBuffer(100, 60.0)
+    buffer.extend([(10.0, 'a'), (5.0, 'b'), (11.0, 'c')])
+    assert buffer.since(10.0) == ['a', 'b', 'c']
+    assert buffer.since(10.5) == ['c']
+
+
+def test_compaction_keeps_contents():
+    maxlen = 100
+    count = TimeIndexedBuffer.COMPACT_MIN * 3
+    buffer = _filled(count, maxlen=maxlen)
+
+    assert len(buffer._items) < count
+    assert list(buffer) == list(range(count - maxlen, count))
+    assert buffer.since(count - 10.0) == list(range(count - 10, count))
+
+
+def test_latest_and_clear():
+    buffer = _filled(10, maxlen=5)
+    assert buffer.latest() == [9]
+    assert buffer.latest(20) == [5, 6, 7, 8, 9]
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.since(0.0) == []
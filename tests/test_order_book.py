@@ -0,0 +1,121 @@
+import asyncio
+
+from core.order_book import BookSide, LocalOrderBook, OrderBookManager, merge_diffs
+
+
+def _diff(first, last, bids=(), asks=()):
+    return {'e': 'depthUpdate', 'E': last, 's': 'BTCUSDT', 'U': first, 'u': last,
+            'b': [list(level) for level in bids], 'a': [list(level) for level in asks]}
+
+
+def _snapshot(last_update_id):
+    return {'lastUpdateId': last_update_id,
+            'bids': [['100.0', '1.0'], ['99.0', '2.0']],
+            'asks': [['101.0', '1.5'], ['102.0', '3.0']]}
+
+
+def test_merge_diffs_spans_both_ranges_and_newer_quantity_wins():
+    older = _diff(10, 12, bids=[('100.0', '1.0'), ('99.0', '2.0')], asks=[('101.0', '1.0')])
+    newer = _diff(13, 15, bids=[('100.0', '0.0')], asks=[('102.0', '4.0')])
+
+    merged = merge_diffs(older, newer)
+
+    assert (merged['U'], merged['u']) == (10, 15)
+    assert dict(map(tuple, merged['b'])) == {'100.0': '0.0', '99.0': '2.0'}
+    assert dict(map(tuple, merged['a'])) == {'101.0': '1.0', '102.0': '4.0'}
+
+
+def test_merged_diff_applies_like_the_pair():
+    older = _diff(11, 12, bids=[('100.0', '5.0')], asks=[('101.0', '0.0')])
+    newer = _diff(13, 14, bids=[('100.0', '0.0'), ('98.0', '1.0')])
+
+    one, two = LocalOrderBook('BTCUSDT'), LocalOrderBook('BTCUSDT')
+    for book in (one, two):
+        book.apply_snapshot(_snapshot(10))
+    assert one.apply_diff(older) and one.apply_diff(newer)
+    assert two.apply_diff(merge_diffs(older, newer))
+
+    assert one.top(5) == two.top(5)
+    assert one.last_update_id == two.last_update_id == 14
+
+
+def test_buffered_diffs_up_to_snapshot_are_dropped():
+    book = LocalOrderBook('BTCUSDT')
+    assert not book.apply_diff(_diff(5, 9, bids=[('100.0', '9.0')]))
+    assert not book.apply_diff(_diff(10, 12, asks=[('101.0', '0.5')]))
+
+    assert book.apply_snapshot(_snapshot(10))
+
+    assert book.best_bid() == (100.0, 1.0)
+    assert book.best_ask() == (101.0, 0.5)
+    assert book.last_update_id == 12
+
+
+def test_snapshot_older_than_buffered_events_is_rejected():
+    book = LocalOrderBook('BTCUSDT')
+    book.apply_diff(_diff(20, 22))
+
+    assert not book.apply_snapshot(_snapshot(10))
+    assert not book.synced
+    assert book.pending[0]['U'] == 20
+
+
+def test_sequence_gap_marks_book_out_of_sync():
+    book = LocalOrderBook('BTCUSDT')
+    book.apply_snapshot(_snapshot(10))
+
+    assert book.apply_diff(_diff(11, 11))
+    assert book.apply_diff(_diff(5, 11))
+    assert not book.apply_diff(_diff(13, 14))
+    assert not book.synced
+
+
+def test_book_side_orders_best_last_and_prunes_far_levels():
+    asks = BookSide(is_bid=False, max_levels=3)
+    for price in (105.0, 101.0, 103.0, 102.0):
+        asks.set(price, 1.0)
+    asks.set(110.0, 1.0)
+
+    assert asks.best() == (101.0, 1.0)
+    assert [price for price, _ in asks.top(5)] == [101.0, 102.0, 103.0]
+
+    asks.set(101.0, 0.0)
+    assert asks.best() == (102.0, 1.0)
+    assert len(asks) == 2
+
+    bids = BookSide(is_bid=True, max_levels=2)
+    for price in (99.0, 97.0, 98.0):
+        bids.set(price, 2.0)
+    assert [price for price, _ in bids.top(5)] == [99.0, 98.0]
+
+
+def test_spread_imbalance_and_liquidity():
+    book = LocalOrderBook('BTCUSDT')
+    book.apply_snapshot(_snapshot(10))
+
+    assert book.spread() == 1.0
+    assert book.mid_price() == 100.5
+    assert book.imbalance(2) == (3.0 - 4.5) / 7.5
+    assert book.liquidity(1) == {'bids': 100.0, 'asks': 151.5}
+
+
+def test_manager_counts_only_successful_resyncs():
+    snapshots = [_snapshot(1), _snapshot(30)]
+
+    async def fetch(symbol, depth):
+        return snapshots.pop(0)
+
+    async def run():
+        manager = OrderBookManager(fetch)
+        manager.handle_diff('BTCUSDT', _diff(20, 22))
+        await asyncio.sleep(0)
+        assert manager.resyncs == 0
+        assert manager.get('BTCUSDT') is None
+
+        manager.handle_diff('BTCUSDT', _diff(23, 24))
+        await asyncio.sleep(0)
+        return manager
+
+    manager = asyncio.run(run())
+    assert manager.resyncs == 1
+    assert manager.get('BTCUSDT') is not None
@@ -0,0 +1,27 @@
+from core.order_flow import TimeWindowFlow, order_flow_imbalance
+
+
+def test_imbalance_of_empty_flow_is_zero():
+    assert order_flow_imbalance(0.0, 0.0) == 0.0
+
+
+def test_window_keeps_recent_trades():
+    flow = TimeWindowFlow(10)
+    flow.add(1_000, 3.0, False)
+    flow.add(2_000, 1.0, True)
+    assert flow.imbalance(5_000) == 0.5
+
+
+def test_quiet_symbol_decays_without_new_trades():
+    flow = TimeWindowFlow(10)
+    flow.add(1_000, 3.0, False)
+    assert flow.imbalance(5_000) == 1.0
+    assert flow.imbalance(60_000) == 0.0
+    assert flow.buy_volume == 0.0
+
+
+def test_reading_without_now_uses_the_clock():
+    flow = TimeWindowFlow(10)
+    flow.add(1_000, 3.0, False)
+    # a trade from 1970 is far outside any window measured from the wall clock
+    assert flow.imbalance() == 0.0
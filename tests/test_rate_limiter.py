@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import (PRIORITY_MARKET_DATA, PRIORITY_ORDER, WeightRateLimiter)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', fake)
+    return fake
+
+
+def test_bucket_refills_evenly_up_to_capacity(clock):
+    limiter = WeightRateLimiter(capacity=60, period=60)
+
+    async def spend():
+        return await limiter.acquire(40)
+
+    assert asyncio.run(spend()) == 0.0
+    assert limiter.get_stats()['available'] == 20.0
+
+    clock.now += 10
+    assert limiter.get_stats()['available'] == 30.0
+
+    clock.now += 1000
+    assert limiter.get_stats()['available'] == 60.0
+
+
+def test_get_stats_does_not_write_bucket_state(clock):
+    limiter = WeightRateLimiter(capacity=60, period=60)
+    limiter.tokens = 10.0
+    updated = limiter._updated
+
+    clock.now += 5
+    assert limiter.get_stats()['available'] == 15.0
+    assert limiter.tokens == 10.0
+    assert limiter._updated == updated
+
+
+def test_sync_used_weight_only_lowers_the_bucket(clock):
+    limiter = WeightRateLimiter(capacity=100, period=60)
+
+    limiter.sync_used_weight(70)
+    assert limiter.tokens == 30.0
+
+    limiter.sync_used_weight(10)
+    assert limiter.tokens == 30.0
+
+
+def test_pause_empties_the_bucket(clock):
+    limiter = WeightRateLimiter(capacity=100, period=60)
+    limiter.pause(5)
+    assert limiter.tokens == 0.0
+    assert limiter._paused_until == clock.now + 5
+
+
+def test_orders_overtake_queued_market_data():
+    async def run():
+        limiter = WeightRateLimiter(capacity=10, period=0.1)
+        await limiter.acquire(10)
+
+        finished = []
+
+        async def request(name, weight, priority):
+            await limiter.acquire(weight, priority)
+            finished.append(name)
+
+        tasks = [asyncio.create_task(request('market_1', 5, PRIORITY_MARKET_DATA)),
+                 asyncio.create_task(request('market_2', 5, PRIORITY_MARKET_DATA))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request('order', 5, PRIORITY_ORDER)))
+        await asyncio.gather(*tasks)
+        await limiter.close()
+        return finished, limiter.get_stats()
+
+    finished, stats = asyncio.run(run())
+    assert finished == ['order', 'market_1', 'market_2']
+    assert stats['queued'] == 3
+    assert stats['wait_time']['order']['count'] == 1
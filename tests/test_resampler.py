@@ -0,0 +1,62 @@
+from core.resampler import INTERVAL_MS, BarResampler
+
+MINUTE = INTERVAL_MS['1m']
+HOUR_START = 1_700_002_800_000  # a whole hour, so also a 5m and 15m boundary
+
+
+def bar(open_time, close, volume=1.0):
+    return (open_time, close - 1, close + 1, close - 2, close, volume)
+
+
+def feed(resampler, minutes, start=HOUR_START):
+    emitted = []
+    for i in minutes:
+        emitted.extend(resampler.update(bar(start + i * MINUTE, 100.0 + i)))
+    return emitted
+
+
+def test_bucket_is_emitted_on_its_last_base_bar():
+    resampler = BarResampler('5m')
+    assert feed(resampler, range(4)) == []
+
+    (emitted,) = feed(resampler, [4])
+    open_time, open_, high, low, close, volume = emitted
+    assert open_time == HOUR_START
+    assert open_ == 99.0
+    assert high == 105.0
+    assert low == 98.0
+    assert close == 104.0
+    assert volume == 5.0
+
+
+def test_consecutive_buckets_align_to_interval_boundaries():
+    emitted = feed(BarResampler('15m'), range(45))
+    assert [b[0] for b in emitted] == [HOUR_START + i * INTERVAL_MS['15m'] for i in range(3)]
+
+
+def test_bucket_first_seen_mid_interval_is_dropped():
+    emitted = feed(BarResampler('5m'), range(2, 10))
+    assert [b[0] for b in emitted] == [HOUR_START + INTERVAL_MS['5m']]
+
+
+def test_missing_minutes_flush_on_the_next_bucket():
+    resampler = BarResampler('5m')
+    # minute 4 never arrives, so bucket 0 is only closed by a bar from bucket 1
+    assert feed(resampler, range(4)) == []
+    (emitted,) = feed(resampler, [5])
+    assert emitted[0] == HOUR_START
+    assert emitted[5] == 4.0
+
+
+def test_marked_incomplete_bucket_is_not_emitted():
+    resampler = BarResampler('5m')
+    feed(resampler, range(3))
+    resampler.mark_incomplete()
+    assert feed(resampler, [3, 4]) == []
+    assert len(feed(resampler, range(5, 10))) == 1
+
+
+def test_bars_older_than_the_open_bucket_are_ignored():
+    resampler = BarResampler('5m')
+    feed(resampler, range(5, 7))
+    assert resampler.update(bar(HOUR_START, 1.0)) == []
@@ -0,0 +1,64 @@
+import json
+import os
+
+import numpy as np
+
+from core.decoder import KlineRecord, TradeRecord, message_from_json, message_to_json
+from core.snapshot import EXTRA_FILE, read_snapshot, write_snapshot
+
+MESSAGES = [
+    TradeRecord('BTCUSDT', 1_700_000_000_100, 1_700_000_000_090, 35000.5, 0.25, True, 1_700_000_000.2),
+    KlineRecord('BTCUSDT', 1_700_000_000_200, 1_699_999_980_000, 35000.0, 35010.0, 34990.0,
+                35005.0, 12.5, False, 1_700_000_000.3),
+    {'stream': 'btcusdt@bookTicker', 'data': {'b': '35000.0', 'a': '35001.0'},
+     'received_at': 1_700_000_000.4},
+]
+
+
+def _write(path):
+    arrays = {'BTCUSDT/klines/1m': np.arange(12, dtype=np.float64).reshape(6, 2)}
+    extra = {'websocket_buffers': {'BTCUSDT': [message_to_json(m) for m in MESSAGES]}}
+    write_snapshot(str(path), arrays, extra)
+    return arrays
+
+
+def test_round_trip_restores_arrays_and_messages(tmp_path):
+    path = tmp_path / 'state'
+    arrays = _write(path)
+
+    created_at, restored, extra = read_snapshot(str(path))
+
+    np.testing.assert_array_equal(restored['BTCUSDT/klines/1m'], arrays['BTCUSDT/klines/1m'])
+    messages = [message_from_json(data) for data in extra['websocket_buffers']['BTCUSDT']]
+    assert messages == MESSAGES
+    assert type(messages[0]) is TradeRecord
+    assert type(messages[1]) is KlineRecord
+
+
+def test_bad_extra_file_keeps_arrays(tmp_path):
+    path = tmp_path / 'state'
+    arrays = _write(path)
+    with open(os.path.join(path, EXTRA_FILE), 'w') as f:
+        f.write('{"websocket_buffers": ')
+
+    created_at, restored, extra = read_snapshot(str(path))
+
+    assert extra == {}
+    np.testing.assert_array_equal(restored['BTCUSDT/klines/1m'], arrays['BTCUSDT/klines/1m'])
+
+
+def test_extra_is_plain_json(tmp_path):
+    path = tmp_path / 'state'
+    _write(path)
+
+    with open(os.path.join(path, EXTRA_FILE)) as f:
+        extra = json.load(f)
+
+    assert [entry['type'] for entry in extra['websocket_buffers']['BTCUSDT']] == ['trade', 'kline', 'frame']
+
+
+def test_stale_snapshot_is_ignored(tmp_path):
+    path = tmp_path / 'state'
+    write_snapshot(str(path), {'x': np.zeros(3)}, created_at=0.0)
+
+    assert read_snapshot(str(path), max_age=60) is None
@@ -0,0 +1,54 @@
+import math
+
+import pytest
+
+from core.feature_engine import FeatureEngine
+from tests.market_data import make_klines, make_trades
+
+
+def feed(engine, klines, trades):
+    for kline in klines:
+        engine.add_kline('X', kline)
+    for trade in trades:
+        engine.add_trade('X', trade)
+
+
+def engines(bars, seed):
+    klines, trades = make_klines(bars, seed), make_trades(500, seed)
+    streaming, batch = FeatureEngine(), FeatureEngine()
+    streaming.streaming, batch.streaming = True, False
+    feed(streaming, klines, trades)
+    feed(batch, klines, trades)
+    return streaming, batch
+
+
+@pytest.mark.parametrize('bars', [30, 59, 60, 100, 250])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_streaming_features_match_batch_recompute(bars, seed):
+    streaming, batch = engines(bars, seed)
+
+    expected = batch.calculate_features('X')
+    actual = streaming.calculate_features('X')
+
+    assert expected.keys() == actual.keys()
+    for name in expected:
+        assert math.isclose(float(actual[name]), float(expected[name]),
+                            rel_tol=1e-9, abs_tol=1e-9), name
+
+
+def test_batch_rows_match_single_symbol_features():
+    _, batch = engines(120, 3)
+
+    single = batch.calculate_features('X')
+    batch.feature_cache.clear()
+    batch.cache_state.clear()
+    symbols, matrix = batch.calculate_features_batch(['X', 'MISSING'])
+
+    assert symbols == ['X']
+    assert matrix[0] == pytest.approx([float(v) for v in single.values()], rel=1e-9, abs=1e-9)
+
+
+def test_too_few_bars_yields_no_features():
+    streaming, batch = engines(29, 0)
+    assert streaming.calculate_features('X') is None
+    assert batch.calculate_features('X') is None
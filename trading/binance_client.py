@@ -1,16 +1,41 @@
 import aiohttp
+import asyncio
 import time
 import hmac
 import hashlib
-from typing import Dict, Any, Optional
+import json
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
 from urllib.parse import urlencode
 
-from config import BINANCE_CONFIG, TRADING_CONFIG
+from config import BINANCE_CONFIG, TRADING_CONFIG, WEBSOCKET_CONFIG
 from utils.logger import get_logger
 from utils.circuit_breaker import CircuitBreaker
+from utils.clock_sync import ClockSync
+from utils.rate_limiter import (
+    WeightRateLimiter, PRIORITY_ORDER, PRIORITY_ACCOUNT, PRIORITY_MARKET_DATA
+)
+from utils.histogram import LatencyHistogram
+from core.price_cache import PriceCache
+from core.resampler import INTERVAL_MS
 
 logger = get_logger(__name__)
 
+def request_weight(endpoint: str, params: Dict[str, Any]) -> int:
+    if endpoint == BINANCE_CONFIG["ENDPOINTS"]["depth"]:
+        limit = int(params.get('limit', 100))
+        for max_limit, weight in BINANCE_CONFIG["DEPTH_WEIGHTS"]:
+            if limit <= max_limit:
+                return weight
+        return BINANCE_CONFIG["DEPTH_WEIGHTS"][-1][1]
+    
+    single, every = BINANCE_CONFIG["REQUEST_WEIGHTS"].get(endpoint, (1, 1))
+    return single if 'symbol' in params else every
+
+def format_decimal(value: float) -> str:
+    # str() switches to exponent notation below 1e-4, which the API rejects
+    return f"{value:.8f}".rstrip('0').rstrip('.')
+
 class BinanceClient:
     def __init__(self):
         self.api_key = BINANCE_CONFIG["API_KEY"]
@@ -23,14 +48,120 @@ class BinanceClient:
         
         self.session: Optional[aiohttp.ClientSession] = None
         self.circuit_breaker = CircuitBreaker()
+        self.clock = ClockSync(
+            self.sample_server_time,
+            sync_interval=WEBSOCKET_CONFIG["TIMESTAMP_SYNC_INTERVAL"],
+            max_drift=WEBSOCKET_CONFIG["MAX_TIMESTAMP_DRIFT"],
+            samples=WEBSOCKET_CONFIG["TIMESTAMP_SYNC_SAMPLES"]
+        )
+        self.price_cache = PriceCache(WEBSOCKET_CONFIG["PRICE_CACHE_MAX_AGE"])
+        self.rate_limiter = WeightRateLimiter(
+            BINANCE_CONFIG["RATE_LIMIT_REQUESTS"],
+            BINANCE_CONFIG["RATE_LIMIT_PERIOD"]
+        )
+        self.connect_times = LatencyHistogram()
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.connections_queued = 0
+        self.requests_in_flight = 0
+        self.requests_waiting = 0
+        self.request_timeouts = 0
+        self.keep_warm_running = False
         
         logger.info("binance_client_initialized", testnet=self.testnet)
     
     async def _get_session(self) -> aiohttp.ClientSession:
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = self._create_session()
         return self.session
     
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=BINANCE_CONFIG["HTTP_POOL_LIMIT"],
+            limit_per_host=BINANCE_CONFIG["HTTP_POOL_LIMIT_PER_HOST"],
+            keepalive_timeout=BINANCE_CONFIG["HTTP_KEEPALIVE_TIMEOUT"],
+            ttl_dns_cache=BINANCE_CONFIG["HTTP_DNS_CACHE_TTL"],
+            happy_eyeballs_delay=BINANCE_CONFIG["HTTP_HAPPY_EYEBALLS_DELAY"],
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=BINANCE_CONFIG["HTTP_REQUEST_TIMEOUT"],
+            sock_connect=BINANCE_CONFIG["HTTP_CONNECT_TIMEOUT"]
+        )
+        
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_start.append(self._on_connection_create_start)
+        trace.on_connection_create_end.append(self._on_connection_create_end)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        trace.on_connection_queued_start.append(self._on_connection_queued_start)
+        trace.on_connection_queued_end.append(self._on_connection_queued_end)
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_done)
+        trace.on_request_exception.append(self._on_request_done)
+        
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[trace]
+        )
+    
+    async def _on_connection_create_start(self, session, context, params):
+        context.connect_started = time.monotonic()
+    
+    async def _on_connection_create_end(self, session, context, params):
+        self.connections_created += 1
+        self.connect_times.record(time.monotonic() - context.connect_started)
+    
+    async def _on_connection_reused(self, session, context, params):
+        self.connections_reused += 1
+    
+    async def _on_connection_queued_start(self, session, context, params):
+        self.connections_queued += 1
+        self.requests_waiting += 1
+    
+    async def _on_connection_queued_end(self, session, context, params):
+        self.requests_waiting -= 1
+    
+    async def _on_request_start(self, session, context, params):
+        self.requests_in_flight += 1
+    
+    async def _on_request_done(self, session, context, params):
+        self.requests_in_flight -= 1
+    
+    def _request_timeout(self, priority: int) -> aiohttp.ClientTimeout:
+        total = (TRADING_CONFIG["ORDER_TIMEOUT"]
+                if priority == PRIORITY_ORDER
+                else BINANCE_CONFIG["HTTP_REQUEST_TIMEOUT"])
+        return aiohttp.ClientTimeout(
+            total=total,
+            sock_connect=BINANCE_CONFIG["HTTP_CONNECT_TIMEOUT"]
+        )
+    
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """Opens pooled connections ahead of time so the first real request skips TCP and TLS setup."""
+        connections = connections or BINANCE_CONFIG["HTTP_WARM_CONNECTIONS"]
+        created = self.connections_created
+        results = await asyncio.gather(
+            *(self.ping() for _ in range(connections)),
+            return_exceptions=True
+        )
+        failures = sum(1 for result in results if isinstance(result, Exception))
+        
+        logger.info("http_pool_warmed",
+                   connections=self.connections_created - created,
+                   failures=failures)
+        return connections - failures
+    
+    async def keep_warm(self):
+        """Pings often enough that idle pooled connections never reach the keep-alive timeout."""
+        self.keep_warm_running = True
+        while self.keep_warm_running:
+            await asyncio.sleep(BINANCE_CONFIG["HTTP_KEEP_WARM_INTERVAL"])
+            try:
+                await self.warm_up()
+            except Exception as e:
+                logger.warning("http_keep_warm_failed", error=str(e))
+    
     def _generate_signature(self, params: Dict[str, Any]) -> str:
         query_string = urlencode(params)
         signature = hmac.new(
@@ -44,35 +175,97 @@ class BinanceClient:
                       method: str, 
                       endpoint: str, 
                       params: Optional[Dict[str, Any]] = None,
-                      signed: bool = False) -> Dict[str, Any]:
+                      signed: bool = False,
+                      priority: Optional[int] = None,
+                      timing: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         
         if params is None:
             params = {}
         
-        if signed:
-            params['timestamp'] = int(time.time() * 1000)
-            params['signature'] = self._generate_signature(params)
+        if priority is None:
+            if method != 'GET':
+                priority = PRIORITY_ORDER
+            elif signed:
+                priority = PRIORITY_ACCOUNT
+            else:
+                priority = PRIORITY_MARKET_DATA
         
+        weight = request_weight(endpoint, params)
         url = f"{self.base_url}{endpoint}"
         headers = {'X-MBX-APIKEY': self.api_key} if self.api_key else {}
         
         session = await self._get_session()
+        timeout = self._request_timeout(priority)
         
-        try:
-            if method == 'GET':
-                async with session.get(url, params=params, headers=headers) as response:
-                    return await response.json()
-            elif method == 'POST':
-                async with session.post(url, params=params, headers=headers) as response:
-                    return await response.json()
-            elif method == 'DELETE':
-                async with session.delete(url, params=params, headers=headers) as response:
+        for attempt in range(BINANCE_CONFIG["RATE_LIMIT_RETRIES"] + 1):
+            await self.rate_limiter.acquire(weight, priority)
+            
+            # sign after queueing so the timestamp is fresh when the request leaves
+            request_params = dict(params)
+            if signed:
+                request_params['timestamp'] = self.clock.now_ms()
+                request_params['signature'] = self._generate_signature(request_params)
+            
+            if timing is not None:
+                timing['sent'] = time.time()
+            
+            try:
+                async with session.request(method, url, params=request_params,
+                                           headers=headers, timeout=timeout) as response:
+                    used_weight = response.headers.get('X-MBX-USED-WEIGHT-1M')
+                    if used_weight is not None:
+                        self.rate_limiter.sync_used_weight(int(used_weight))
+                    
+                    if response.status in (418, 429):
+                        retry_after = float(response.headers.get('Retry-After', 60))
+                        self.rate_limiter.pause(retry_after)
+                        logger.warning("api_rate_limited",
+                                     endpoint=endpoint,
+                                     status=response.status,
+                                     retry_after=retry_after,
+                                     attempt=attempt)
+                        # a 418 is an IP ban; waiting it out in the queue is not an option
+                        if response.status == 418:
+                            response.raise_for_status()
+                        continue
+                    
                     return await response.json()
-        except Exception as e:
-            logger.error("api_request_failed", 
-                        endpoint=endpoint, 
-                        error=str(e))
-            raise
+            except asyncio.TimeoutError:
+                self.request_timeouts += 1
+                logger.error("api_request_timeout",
+                            endpoint=endpoint,
+                            timeout=timeout.total)
+                raise
+            except Exception as e:
+                logger.error("api_request_failed", 
+                            endpoint=endpoint, 
+                            error=str(e))
+                raise
+        
+        raise aiohttp.ClientResponseError(
+            response.request_info, response.history,
+            status=429, message="rate limit retries exhausted"
+        )
+    
+    async def ping(self) -> Dict[str, Any]:
+        return await self._request('GET', BINANCE_CONFIG["ENDPOINTS"]["ping"])
+    
+    async def sample_server_time(self) -> Tuple[float, int]:
+        """Server time together with the local time the request left, after any rate limit wait."""
+        timing: Dict[str, float] = {}
+        result = await self._request(
+            'GET',
+            BINANCE_CONFIG["ENDPOINTS"]["server_time"],
+            timing=timing
+        )
+        return timing['sent'], int(result['serverTime'])
+    
+    async def get_server_time(self) -> int:
+        result = await self._request(
+            'GET',
+            BINANCE_CONFIG["ENDPOINTS"]["server_time"]
+        )
+        return int(result['serverTime'])
     
     async def get_account_info(self) -> Dict[str, Any]:
         if not TRADING_CONFIG["TRADING_ENABLED"]:
@@ -127,11 +320,11 @@ class BinanceClient:
             'symbol': symbol,
             'side': side,
             'type': order_type,
-            'quantity': quantity
+            'quantity': format_decimal(quantity)
         }
         
         if order_type == 'LIMIT' and price:
-            params['price'] = price
+            params['price'] = format_decimal(price)
             params['timeInForce'] = 'GTC'
         
         try:
@@ -176,25 +369,70 @@ class BinanceClient:
             signed=True
         )
     
-    async def get_symbol_price(self, symbol: str) -> float:
+    async def get_symbol_price(self, symbol: str, max_age: Optional[float] = None) -> float:
+        cached = self.price_cache.price(symbol, max_age)
+        if cached is not None:
+            return cached
+        
         result = await self._request(
             'GET',
-            BINANCE_CONFIG["ENDPOINTS"]["ticker_24hr"],
+            BINANCE_CONFIG["ENDPOINTS"]["ticker_price"],
             params={'symbol': symbol}
         )
         
-        return float(result.get('lastPrice', 0))
+        price = float(result.get('price', 0))
+        if price > 0:
+            self.price_cache.update_trade(symbol, price)
+        return price
+    
+    async def get_exchange_info(self, symbols: Optional[List[str]] = None) -> Dict[str, Any]:
+        params = {}
+        if symbols:
+            params['symbols'] = json.dumps(symbols, separators=(',', ':'))
+        return await self._request(
+            'GET',
+            BINANCE_CONFIG["ENDPOINTS"]["exchange_info"],
+            params=params
+        )
+    
+    async def get_all_prices(self) -> Dict[str, float]:
+        """Last price of every symbol from a single ticker/price call."""
+        result = await self._request(
+            'GET',
+            BINANCE_CONFIG["ENDPOINTS"]["ticker_price"]
+        )
+        
+        received_at = time.time()
+        prices = {}
+        for ticker in result:
+            price = float(ticker['price'])
+            prices[ticker['symbol']] = price
+            self.price_cache.update_trade(ticker['symbol'], price, received_at)
+        return prices
+    
+    async def get_order_book(self, symbol: str, limit: int = 1000) -> Dict[str, Any]:
+        return await self._request(
+            'GET',
+            BINANCE_CONFIG["ENDPOINTS"]["depth"],
+            params={'symbol': symbol, 'limit': limit}
+        )
     
     async def get_klines(self, 
                         symbol: str, 
                         interval: str = '1m', 
-                        limit: int = 100) -> list:
+                        limit: int = 100,
+                        start_time: Optional[int] = None,
+                        end_time: Optional[int] = None) -> list:
         
         params = {
             'symbol': symbol,
             'interval': interval,
             'limit': limit
         }
+        if start_time is not None:
+            params['startTime'] = int(start_time)
+        if end_time is not None:
+            params['endTime'] = int(end_time)
         
         return await self._request(
             'GET',
@@ -202,7 +440,100 @@ class BinanceClient:
             params=params
         )
     
+    async def get_klines_many(self,
+                              symbols: Sequence[str],
+                              intervals: Sequence[str],
+                              start_time: Union[int, Dict[str, int]],
+                              end_time: Optional[int] = None,
+                              concurrency: Optional[int] = None) -> Dict[Tuple[str, str], np.ndarray]:
+        """Fetches ``[start_time, end_time]`` for every symbol/interval pair.
+        
+        ``start_time`` may also map each interval to its own start. Each range is split into pages of ``KLINES_PAGE_LIMIT`` bars up
+        front, so all pages of all pairs are fetched concurrently, at most
+        ``concurrency`` at a time. Every pair maps to a float64 array with
+        one row per bar and the columns open time, open, high, low, close,
+        volume, sorted by open time. Pairs with a failed page are left out.
+        """
+        if end_time is None:
+            end_time = self.clock.now_ms()
+        page_limit = BINANCE_CONFIG["KLINES_PAGE_LIMIT"]
+        semaphore = asyncio.Semaphore(concurrency or BINANCE_CONFIG["KLINES_CONCURRENCY"])
+        
+        async def fetch_page(symbol: str, interval: str, page_start: int, page_end: int) -> list:
+            async with semaphore:
+                klines = await self.get_klines(
+                    symbol, interval, page_limit,
+                    start_time=page_start, end_time=page_end
+                )
+            if not isinstance(klines, list):
+                raise ValueError(str(klines))
+            return klines
+        
+        async def fetch(symbol: str, interval: str) -> Optional[np.ndarray]:
+            interval_ms = INTERVAL_MS[interval]
+            start = start_time[interval] if isinstance(start_time, dict) else start_time
+            first_open = -(-int(start) // interval_ms) * interval_ms
+            page_ms = page_limit * interval_ms
+            
+            pages = await asyncio.gather(*(
+                fetch_page(symbol, interval, page_start,
+                           min(page_start + page_ms - 1, int(end_time)))
+                for page_start in range(first_open, int(end_time) + 1, page_ms)
+            ), return_exceptions=True)
+            
+            errors = [page for page in pages if isinstance(page, Exception)]
+            if errors:
+                logger.warning("klines_fetch_failed",
+                             symbol=symbol,
+                             interval=interval,
+                             failed_pages=len(errors),
+                             error=str(errors[0]))
+                return None
+            
+            rows = [kline[:6] for page in pages for kline in page]
+            if not rows:
+                return np.empty((0, 6))
+            bars = np.array(rows, dtype=np.float64)
+            _, unique = np.unique(bars[:, 0], return_index=True)
+            return bars[unique]
+        
+        pairs = [(symbol, interval) for symbol in symbols for interval in intervals]
+        started = time.monotonic()
+        results = await asyncio.gather(*(fetch(symbol, interval) for symbol, interval in pairs))
+        
+        klines = {pair: bars for pair, bars in zip(pairs, results) if bars is not None}
+        logger.info("klines_fetched",
+                   pairs=len(pairs),
+                   failed=len(pairs) - len(klines),
+                   bars=sum(len(bars) for bars in klines.values()),
+                   duration=time.monotonic() - started)
+        return klines
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        return self.rate_limiter.get_stats()
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        # every figure comes from the trace callbacks; the connector's pool internals are private
+        connector = self.session.connector if self.session and not self.session.closed else None
+        limit = connector.limit_per_host if connector else BINANCE_CONFIG["HTTP_POOL_LIMIT_PER_HOST"]
+        # a request counts as started while it still waits for a free connection
+        in_use = self.requests_in_flight - self.requests_waiting
+        
+        return {
+            'in_use': in_use,
+            'waiting_for_connection': self.requests_waiting,
+            'limit_per_host': limit,
+            'utilization': in_use / limit if limit else 0.0,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'connections_queued': self.connections_queued,
+            'request_timeouts': self.request_timeouts,
+            'connect_time': self.connect_times.summary(),
+        }
+    
     async def close(self):
+        self.keep_warm_running = False
+        await self.rate_limiter.close()
         if self.session and not self.session.closed:
             await self.session.close()
             logger.info("binance_client_closed")
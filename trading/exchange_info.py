@@ -0,0 +1,185 @@
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _decimals(step: str) -> int:
+    """Decimal places of a filter step such as ``'0.00100000'``."""
+    fraction = step.rstrip('0').partition('.')[2]
+    return len(fraction)
+
+
+class SymbolFilters:
+    """LOT_SIZE, PRICE_FILTER and MIN_NOTIONAL/NOTIONAL rules of one symbol as plain floats.
+
+    Steps are parsed once, together with their number of decimals, so
+    rounding is a floor/round on floats and the final ``round`` strips the
+    binary noise that would otherwise show up when the value is sent.
+    """
+
+    __slots__ = ('symbol', 'status', 'step_size', 'quantity_decimals', 'min_qty', 'max_qty',
+                 'market_step_size', 'market_min_qty', 'market_max_qty',
+                 'tick_size', 'price_decimals', 'min_price', 'max_price',
+                 'min_notional', 'max_notional', 'notional_applies_to_market')
+
+    def __init__(self, info: Dict[str, Any]):
+        self.symbol = info['symbol']
+        self.status = info.get('status', 'TRADING')
+
+        self.step_size = 0.0
+        self.quantity_decimals = 8
+        self.min_qty = 0.0
+        self.max_qty = math.inf
+        self.market_step_size = None
+        self.market_min_qty = 0.0
+        self.market_max_qty = math.inf
+        self.tick_size = 0.0
+        self.price_decimals = 8
+        self.min_price = 0.0
+        self.max_price = math.inf
+        self.min_notional = 0.0
+        self.max_notional = math.inf
+        self.notional_applies_to_market = True
+
+        for rule in info.get('filters', []):
+            kind = rule['filterType']
+            if kind == 'LOT_SIZE':
+                self.step_size = float(rule['stepSize'])
+                self.quantity_decimals = _decimals(rule['stepSize'])
+                self.min_qty = float(rule['minQty'])
+                self.max_qty = float(rule['maxQty'])
+            elif kind == 'MARKET_LOT_SIZE':
+                # a zero step means the LOT_SIZE step applies to market orders too
+                if float(rule['stepSize']) > 0:
+                    self.market_step_size = float(rule['stepSize'])
+                self.market_min_qty = float(rule['minQty'])
+                self.market_max_qty = float(rule['maxQty']) or math.inf
+            elif kind == 'PRICE_FILTER':
+                self.tick_size = float(rule['tickSize'])
+                self.price_decimals = _decimals(rule['tickSize'])
+                self.min_price = float(rule['minPrice'])
+                self.max_price = float(rule['maxPrice']) or math.inf
+            elif kind == 'MIN_NOTIONAL':
+                self.min_notional = float(rule['minNotional'])
+                self.notional_applies_to_market = rule.get('applyToMarket', True)
+            elif kind == 'NOTIONAL':
+                self.min_notional = float(rule['minNotional'])
+                self.max_notional = float(rule.get('maxNotional', 0)) or math.inf
+                self.notional_applies_to_market = rule.get('applyMinToMarket', True)
+
+    def round_quantity(self, quantity: float, market: bool = True) -> float:
+        """Floors ``quantity`` to the lot step, so an order never exceeds the size asked for."""
+        step = self.market_step_size if market and self.market_step_size else self.step_size
+        if step > 0:
+            # the epsilon keeps exact multiples from flooring one step down
+            quantity = math.floor(quantity / step + 1e-9) * step
+        return round(quantity, self.quantity_decimals)
+
+    def round_price(self, price: float) -> float:
+        if self.tick_size > 0:
+            price = round(price / self.tick_size) * self.tick_size
+        return round(price, self.price_decimals)
+
+    def validate(self, quantity: float, price: float, market: bool = True) -> Optional[str]:
+        """Returns why the exchange would reject the order, or None if it passes every filter."""
+        if self.status != 'TRADING':
+            return f"symbol status {self.status}"
+
+        min_qty = max(self.min_qty, self.market_min_qty) if market else self.min_qty
+        max_qty = min(self.max_qty, self.market_max_qty) if market else self.max_qty
+        if quantity < min_qty:
+            return f"quantity {quantity} below min {min_qty}"
+        if quantity > max_qty:
+            return f"quantity {quantity} above max {max_qty}"
+
+        step = self.market_step_size if market and self.market_step_size else self.step_size
+        if step > 0 and abs(quantity / step - round(quantity / step)) > 1e-6:
+            return f"quantity {quantity} not a multiple of step {step}"
+
+        if not market:
+            if price < self.min_price or price > self.max_price:
+                return f"price {price} outside [{self.min_price}, {self.max_price}]"
+            if self.tick_size > 0 and abs(price / self.tick_size - round(price / self.tick_size)) > 1e-6:
+                return f"price {price} not a multiple of tick {self.tick_size}"
+
+        notional = quantity * price
+        if (not market or self.notional_applies_to_market) and notional < self.min_notional:
+            return f"notional {notional:.8f} below min {self.min_notional}"
+        if notional > self.max_notional:
+            return f"notional {notional:.8f} above max {self.max_notional}"
+        return None
+
+
+class ExchangeInfoCache:
+    """Per-symbol order filters from ``exchangeInfo``, loaded once and refreshed in the background.
+
+    A failed refresh keeps serving the previous rules. After a failure the
+    next attempt comes after ``retry_interval`` seconds, doubling on each
+    further failure up to ``refresh_interval``.
+    """
+
+    def __init__(self,
+                 fetch_exchange_info: Callable[[Optional[List[str]]], Awaitable[Dict[str, Any]]],
+                 symbols: Optional[List[str]] = None,
+                 refresh_interval: float = 3600.0,
+                 retry_interval: float = 10.0):
+        self.fetch_exchange_info = fetch_exchange_info
+        self.symbols = symbols
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.filters: Dict[str, SymbolFilters] = {}
+        self.loaded_at: Optional[float] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.running = False
+
+    def get(self, symbol: str) -> Optional[SymbolFilters]:
+        return self.filters.get(symbol)
+
+    async def load(self) -> bool:
+        try:
+            info = await self.fetch_exchange_info(self.symbols)
+            filters = {entry['symbol']: SymbolFilters(entry) for entry in info['symbols']}
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            logger.warning("exchange_info_load_failed",
+                         error=str(e),
+                         consecutive_failures=self.consecutive_failures)
+            return False
+
+        self.filters = filters
+        self.loaded_at = time.time()
+        self.refreshes += 1
+        self.consecutive_failures = 0
+        logger.info("exchange_info_loaded", symbols=len(filters))
+        return True
+
+    async def run(self):
+        self.running = True
+        while self.running:
+            if self.consecutive_failures:
+                delay = min(self.retry_interval * 2 ** (self.consecutive_failures - 1),
+                            self.refresh_interval)
+            else:
+                delay = self.refresh_interval
+            await asyncio.sleep(delay)
+            await self.load()
+
+    def stop(self):
+        self.running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self.filters),
+            'loaded_at': self.loaded_at,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+        }
@@ -0,0 +1,542 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from aiohttp import WSMsgType, web
+
+from core.resampler import INTERVAL_MS
+from trading.binance_client import request_weight
+from utils.logger import setup_logger, get_logger
+
+logger = get_logger(__name__)
+
+BAR_MS = 60_000
+
+
+def synthetic_symbols(count: int) -> List[str]:
+    return [f"SYM{i:04d}USDT" for i in range(count)]
+
+
+class SymbolState:
+    """Random-walk price plus the 1m bar currently being built for one symbol."""
+
+    def __init__(self, symbol: str, start_ms: int):
+        rng = random.Random(symbol)
+        self.symbol = symbol
+        self.base_price = rng.uniform(1, 1000)
+        self.price = self.base_price
+        self.volatility = rng.uniform(0.0002, 0.001)
+        self.trade_id = 0
+        self.tick_size = 10 ** math.floor(math.log10(self.price) - 4)
+        self.update_id = 1
+        self.bids: Dict[int, float] = {}
+        self.asks: Dict[int, float] = {}
+        self._open_bar(start_ms)
+
+    def _open_bar(self, open_time: int):
+        self.bar_open_time = open_time
+        self.bar = [self.price, self.price, self.price, self.price, 0.0, 0]
+
+    def trade(self, rng: random.Random) -> Dict[str, Any]:
+        self.price *= math.exp(rng.gauss(0, self.volatility))
+        quantity = rng.expovariate(1.0)
+        self.trade_id += 1
+
+        bar = self.bar
+        bar[1] = max(bar[1], self.price)
+        bar[2] = min(bar[2], self.price)
+        bar[3] = self.price
+        bar[4] += quantity
+        bar[5] += 1
+
+        now_ms = int(time.time() * 1000)
+        return {
+            'e': 'trade',
+            'E': now_ms,
+            's': self.symbol,
+            't': self.trade_id,
+            'p': f"{self.price:.8f}",
+            'q': f"{quantity:.8f}",
+            'T': now_ms,
+            'm': rng.random() < 0.5,
+            'M': True,
+        }
+
+    def _level(self, tick: int, quantity: float) -> List[str]:
+        return [f"{tick * self.tick_size:.8f}", f"{quantity:.8f}"]
+
+    def depth_diff(self, rng: random.Random, changes: int = 5) -> Dict[str, Any]:
+        mid = int(self.price / self.tick_size)
+        bids: Dict[int, float] = {}
+        asks: Dict[int, float] = {}
+
+        # levels the price walked through are no longer on that side of the book
+        bids.update({tick: 0.0 for tick in self.bids if tick >= mid})
+        asks.update({tick: 0.0 for tick in self.asks if tick <= mid})
+        for _ in range(changes):
+            bids[mid - rng.randint(1, 50)] = rng.choice([0.0, rng.expovariate(0.5)])
+            asks[mid + rng.randint(1, 50)] = rng.choice([0.0, rng.expovariate(0.5)])
+
+        for side, updates in ((self.bids, bids), (self.asks, asks)):
+            for tick, quantity in updates.items():
+                if quantity:
+                    side[tick] = quantity
+                else:
+                    side.pop(tick, None)
+
+        first = self.update_id
+        self.update_id += len(bids) + len(asks)
+        return {
+            'e': 'depthUpdate',
+            'E': int(time.time() * 1000),
+            's': self.symbol,
+            'U': first,
+            'u': self.update_id - 1,
+            'b': [self._level(t, q) for t, q in bids.items()],
+            'a': [self._level(t, q) for t, q in asks.items()],
+        }
+
+    def depth_snapshot(self, limit: int) -> Dict[str, Any]:
+        return {
+            'lastUpdateId': self.update_id - 1,
+            'bids': [self._level(t, self.bids[t]) for t in sorted(self.bids, reverse=True)[:limit]],
+            'asks': [self._level(t, self.asks[t]) for t in sorted(self.asks)[:limit]],
+        }
+
+    def book_ticker(self) -> Dict[str, Any]:
+        bid = max(self.bids, default=int(self.price / self.tick_size) - 1)
+        ask = min(self.asks, default=int(self.price / self.tick_size) + 1)
+        bid_price, bid_quantity = self._level(bid, self.bids.get(bid, 0.0))
+        ask_price, ask_quantity = self._level(ask, self.asks.get(ask, 0.0))
+        return {
+            'u': self.update_id - 1,
+            's': self.symbol,
+            'b': bid_price,
+            'B': bid_quantity,
+            'a': ask_price,
+            'A': ask_quantity,
+        }
+
+    def roll(self, open_time: int) -> Optional[Dict[str, Any]]:
+        """Starts the bar at ``open_time``; returns the previous bar's close only if it ended just now."""
+        if open_time <= self.bar_open_time:
+            return None
+        # bars that ended while nobody was connected are never sent, leaving a real gap
+        closed = self.kline(True) if open_time - self.bar_open_time == BAR_MS else None
+        self._open_bar(open_time)
+        return closed
+
+    def kline(self, closed: bool) -> Dict[str, Any]:
+        o, h, l, c, v, n = self.bar
+        payload = {
+            'e': 'kline',
+            'E': int(time.time() * 1000),
+            's': self.symbol,
+            'k': {
+                't': self.bar_open_time,
+                'T': self.bar_open_time + BAR_MS - 1,
+                's': self.symbol,
+                'i': '1m',
+                'o': f"{o:.8f}",
+                'h': f"{h:.8f}",
+                'l': f"{l:.8f}",
+                'c': f"{c:.8f}",
+                'v': f"{v:.8f}",
+                'n': n,
+                'x': closed,
+            },
+        }
+        return payload
+
+
+def historical_bar(symbol: str, open_time: int, interval_ms: int) -> List[Any]:
+    """Deterministic OHLCV for any (symbol, open time) so REST history is stable across calls."""
+    rng = random.Random(f"{symbol}:{interval_ms}:{open_time}")
+    base = random.Random(symbol).uniform(1, 1000)
+    drift = 1 + 0.05 * math.sin(open_time / (interval_ms * 240))
+    o = base * drift * (1 + rng.gauss(0, 0.002))
+    c = o * (1 + rng.gauss(0, 0.003))
+    h = max(o, c) * (1 + abs(rng.gauss(0, 0.001)))
+    l = min(o, c) * (1 - abs(rng.gauss(0, 0.001)))
+    v = rng.expovariate(1 / 50)
+    return [
+        open_time, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}",
+        open_time + interval_ms - 1, f"{v * c:.8f}", rng.randint(10, 500),
+        f"{v / 2:.8f}", f"{v * c / 2:.8f}", "0",
+    ]
+
+
+class MockExchange:
+    """Stand-in for the Binance combined-stream websocket and the REST endpoints we call.
+
+    Every subscribed symbol emits ``trades_per_second`` trade frames, a depth
+    diff and a book ticker every 100ms and a kline update every
+    ``kline_update_seconds``; a 1m bar is closed every ``bar_seconds`` of
+    wall time (set it below 60 to accelerate). Frames are held back by
+    ``latency_ms`` (+ uniform ``jitter_ms``) before sending; frames that
+    don't fit a connection's ``outbox_size`` queue are dropped and counted. Each
+    connection is dropped after an exponentially distributed time with mean
+    ``disconnect_every`` seconds when that is set. REST responses are delayed
+    by the same latency, carry ``X-MBX-USED-WEIGHT-1M`` and turn into 429s
+    once ``weight_limit`` is exceeded within a minute.
+    """
+
+    def __init__(self,
+                 trades_per_second: float = 10.0,
+                 kline_update_seconds: float = 2.0,
+                 bar_seconds: float = 60.0,
+                 latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0,
+                 disconnect_every: Optional[float] = None,
+                 weight_limit: Optional[int] = None,
+                 outbox_size: int = 10_000,
+                 tick_seconds: float = 0.01):
+        self.trades_per_second = trades_per_second
+        self.kline_update_seconds = kline_update_seconds
+        self.bar_seconds = bar_seconds
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.disconnect_every = disconnect_every
+        self.weight_limit = weight_limit
+        self.outbox_size = outbox_size
+        self.tick_seconds = tick_seconds
+        # bar open times count from here, so time without a connection still passes
+        self.epoch_ms = int(time.time() * 1000) // BAR_MS * BAR_MS
+
+        self.states: Dict[str, SymbolState] = {}
+        self.rng = random.Random(0)
+        self.order_id = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.connections = 0
+        self.disconnects_injected = 0
+        self.weight_window = 0
+        self.used_weight = 0
+        self.rate_limited = 0
+
+    def _bar_open_time(self) -> int:
+        bars = int((time.time() - self.epoch_ms / 1000) / self.bar_seconds)
+        return self.epoch_ms + bars * BAR_MS
+
+    def _state(self, symbol: str) -> SymbolState:
+        if symbol not in self.states:
+            self.states[symbol] = SymbolState(symbol, self._bar_open_time())
+        return self.states[symbol]
+
+    def _delay(self) -> float:
+        return max(self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms), 0.0) / 1000
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.weight_middleware])
+        app.router.add_get('/stream', self.handle_stream)
+        app.router.add_get('/ws', self.handle_stream)
+        app.router.add_get('/api/v3/ping', self.handle_ping)
+        app.router.add_get('/api/v3/time', self.handle_time)
+        app.router.add_get('/api/v3/exchangeInfo', self.handle_exchange_info)
+        app.router.add_get('/api/v3/ticker/24hr', self.handle_ticker)
+        app.router.add_get('/api/v3/ticker/price', self.handle_ticker_price)
+        app.router.add_get('/api/v3/klines', self.handle_klines)
+        app.router.add_get('/api/v3/depth', self.handle_depth)
+        app.router.add_get('/api/v3/account', self.handle_account)
+        app.router.add_post('/api/v3/order', self.handle_create_order)
+        app.router.add_delete('/api/v3/order', self.handle_cancel_order)
+        app.router.add_get('/mock/stats', self.handle_stats)
+        return app
+
+    # websocket
+
+    async def handle_stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        self.connections += 1
+
+        streams: Set[str] = set(filter(None, request.query.get('streams', '').split('/')))
+        outbox: asyncio.Queue = asyncio.Queue(maxsize=self.outbox_size)
+        tasks = [
+            asyncio.create_task(self._generate(streams, outbox)),
+            asyncio.create_task(self._send(ws, outbox)),
+        ]
+        if self.disconnect_every:
+            tasks.append(asyncio.create_task(self._disconnect_later(ws)))
+
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                request_data = json.loads(msg.data)
+                params = request_data.get('params', [])
+                if request_data.get('method') == 'SUBSCRIBE':
+                    streams.update(params)
+                elif request_data.get('method') == 'UNSUBSCRIBE':
+                    streams.difference_update(params)
+                await outbox.put((0.0, json.dumps({'result': None, 'id': request_data.get('id')})))
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.connections -= 1
+
+        return ws
+
+    async def _generate(self, streams: Set[str], outbox: asyncio.Queue):
+        last = time.monotonic()
+        last_kline = last
+        last_depth = last
+        carry: Dict[str, float] = {}
+
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            now = time.monotonic()
+            elapsed, last = now - last, now
+            send_at = now + self._delay()
+
+            open_time = self._bar_open_time()
+            update_klines = now - last_kline >= self.kline_update_seconds
+            update_depth = now - last_depth >= 0.1
+
+            frames = []
+            closes: Dict[str, Optional[Dict[str, Any]]] = {}
+            for stream in list(streams):
+                symbol, _, stream_type = stream.partition('@')
+                state = self._state(symbol.upper())
+                if state.symbol not in closes:
+                    closes[state.symbol] = state.roll(open_time)
+
+                if stream_type == 'trade':
+                    due = carry.get(stream, 0.0) + self.trades_per_second * elapsed
+                    count = int(due)
+                    carry[stream] = due - count
+                    for _ in range(count):
+                        frames.append({'stream': stream, 'data': state.trade(self.rng)})
+
+                elif stream_type.startswith('kline_'):
+                    if closes[state.symbol] is not None:
+                        frames.append({'stream': stream, 'data': closes[state.symbol]})
+                    if update_klines:
+                        frames.append({'stream': stream, 'data': state.kline(False)})
+
+                elif stream_type.startswith('depth') and update_depth:
+                    frames.append({'stream': stream, 'data': state.depth_diff(self.rng)})
+
+                elif stream_type == 'bookTicker' and update_depth:
+                    frames.append({'stream': stream, 'data': state.book_ticker()})
+
+            if update_klines:
+                last_kline = now
+            if update_depth:
+                last_depth = now
+
+            for frame in frames:
+                try:
+                    outbox.put_nowait((send_at, json.dumps(frame)))
+                except asyncio.QueueFull:
+                    # a client that can't keep up loses frames, as it would on the real stream
+                    self.frames_dropped += 1
+
+    async def _send(self, ws: web.WebSocketResponse, outbox: asyncio.Queue):
+        while not ws.closed:
+            send_at, payload = await outbox.get()
+            delay = send_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await ws.send_str(payload)
+            self.frames_sent += 1
+
+    async def _disconnect_later(self, ws: web.WebSocketResponse):
+        await asyncio.sleep(self.rng.expovariate(1 / self.disconnect_every))
+        self.disconnects_injected += 1
+        logger.info("mock_exchange_disconnect_injected")
+        await ws.close(code=1001, message=b'injected disconnect')
+
+    # REST
+
+    @web.middleware
+    async def weight_middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        if not request.path.startswith('/api/'):
+            return await handler(request)
+
+        window = int(time.time() // 60)
+        if window != self.weight_window:
+            self.weight_window = window
+            self.used_weight = 0
+        self.used_weight += request_weight(request.path, request.query)
+
+        if self.weight_limit is not None and self.used_weight > self.weight_limit:
+            self.rate_limited += 1
+            retry_after = 60 - int(time.time() % 60)
+            return web.json_response(
+                {'code': -1003, 'msg': 'Too much request weight used.'},
+                status=429,
+                headers={'Retry-After': str(retry_after),
+                         'X-MBX-USED-WEIGHT-1M': str(self.used_weight)},
+            )
+
+        response = await handler(request)
+        response.headers['X-MBX-USED-WEIGHT-1M'] = str(self.used_weight)
+        return response
+
+    async def _respond(self, payload: Any) -> web.Response:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response(payload)
+
+    async def handle_ping(self, request: web.Request) -> web.Response:
+        return await self._respond({})
+
+    async def handle_time(self, request: web.Request) -> web.Response:
+        return await self._respond({'serverTime': int(time.time() * 1000)})
+
+    async def handle_exchange_info(self, request: web.Request) -> web.Response:
+        if 'symbol' in request.query:
+            names = [request.query['symbol']]
+        elif 'symbols' in request.query:
+            names = json.loads(request.query['symbols'])
+        else:
+            names = sorted(self.states)
+        return await self._respond({
+            'timezone': 'UTC',
+            'serverTime': int(time.time() * 1000),
+            'symbols': [
+                {
+                    'symbol': name,
+                    'status': 'TRADING',
+                    'baseAsset': name[:-4],
+                    'quoteAsset': 'USDT',
+                    'filters': [
+                        {'filterType': 'PRICE_FILTER', 'minPrice': '0.00010000',
+                         'maxPrice': '1000000.00000000', 'tickSize': '0.00010000'},
+                        {'filterType': 'LOT_SIZE', 'minQty': '0.00100000',
+                         'maxQty': '900000.00000000', 'stepSize': '0.00100000'},
+                        {'filterType': 'MIN_NOTIONAL', 'minNotional': '10.00000000',
+                         'applyToMarket': True, 'avgPriceMins': 5},
+                    ],
+                }
+                for name in names
+            ],
+        })
+
+    async def handle_ticker(self, request: web.Request) -> web.Response:
+        state = self._state(request.query['symbol'])
+        return await self._respond({
+            'symbol': state.symbol,
+            'lastPrice': f"{state.price:.8f}",
+            'openPrice': f"{state.base_price:.8f}",
+            'volume': f"{state.bar[4]:.8f}",
+        })
+
+    async def handle_ticker_price(self, request: web.Request) -> web.Response:
+        symbol = request.query.get('symbol')
+        if symbol:
+            state = self._state(symbol)
+            return await self._respond({'symbol': symbol, 'price': f"{state.price:.8f}"})
+        return await self._respond([
+            {'symbol': s.symbol, 'price': f"{s.price:.8f}"} for s in self.states.values()
+        ])
+
+    async def handle_klines(self, request: web.Request) -> web.Response:
+        symbol = request.query['symbol']
+        interval_ms = INTERVAL_MS[request.query.get('interval', '1m')]
+        limit = min(int(request.query.get('limit', 500)), 1000)
+        now_ms = int(time.time() * 1000)
+
+        if 'startTime' in request.query:
+            start = -(-int(request.query['startTime']) // interval_ms) * interval_ms
+            end = int(request.query.get('endTime', now_ms))
+            open_times = range(start, min(end, now_ms) + 1, interval_ms)[:limit]
+        else:
+            end = int(request.query.get('endTime', now_ms)) // interval_ms * interval_ms
+            open_times = range(end - (limit - 1) * interval_ms, end + 1, interval_ms)
+
+        return await self._respond([historical_bar(symbol, t, interval_ms) for t in open_times])
+
+    async def handle_depth(self, request: web.Request) -> web.Response:
+        state = self._state(request.query['symbol'])
+        limit = min(int(request.query.get('limit', 100)), 5000)
+        return await self._respond(state.depth_snapshot(limit))
+
+    async def handle_account(self, request: web.Request) -> web.Response:
+        return await self._respond({
+            'balances': [{'asset': 'USDT', 'free': '10000.00000000', 'locked': '0.00000000'}],
+        })
+
+    async def handle_create_order(self, request: web.Request) -> web.Response:
+        self.order_id += 1
+        symbol = request.query['symbol']
+        state = self._state(symbol)
+        return await self._respond({
+            'symbol': symbol,
+            'orderId': self.order_id,
+            'transactTime': int(time.time() * 1000),
+            'price': f"{state.price:.8f}",
+            'origQty': request.query.get('quantity'),
+            'executedQty': request.query.get('quantity'),
+            'status': 'FILLED',
+            'type': request.query.get('type', 'MARKET'),
+            'side': request.query.get('side'),
+        })
+
+    async def handle_cancel_order(self, request: web.Request) -> web.Response:
+        return await self._respond({
+            'symbol': request.query.get('symbol'),
+            'orderId': int(request.query.get('orderId', 0)),
+            'status': 'CANCELED',
+        })
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'symbols': len(self.states),
+            'connections': self.connections,
+            'frames_sent': self.frames_sent,
+            'frames_dropped': self.frames_dropped,
+            'disconnects_injected': self.disconnects_injected,
+            'used_weight': self.used_weight,
+            'rate_limited': self.rate_limited,
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock Binance exchange for load testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--trades-per-second', type=float, default=10.0,
+                        help="trade frames per subscribed symbol per second")
+    parser.add_argument('--kline-update-seconds', type=float, default=2.0)
+    parser.add_argument('--bar-seconds', type=float, default=60.0,
+                        help="wall seconds per closed 1m bar; lower it to accelerate")
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--disconnect-every', type=float, default=None,
+                        help="mean seconds between injected disconnects per connection")
+    parser.add_argument('--weight-limit', type=int, default=None,
+                        help="answer 429 once this much request weight is used in a minute")
+    parser.add_argument('--outbox-size', type=int, default=10_000,
+                        help="frames queued per connection before new ones are dropped")
+    parser.add_argument('--print-symbols', type=int, default=None,
+                        help="print N synthetic symbols for BINANCE_SYMBOLS and exit")
+    args = parser.parse_args()
+
+    if args.print_symbols is not None:
+        print(",".join(synthetic_symbols(args.print_symbols)))
+        return
+
+    setup_logger()
+    exchange = MockExchange(
+        trades_per_second=args.trades_per_second,
+        kline_update_seconds=args.kline_update_seconds,
+        bar_seconds=args.bar_seconds,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        disconnect_every=args.disconnect_every,
+        weight_limit=args.weight_limit,
+        outbox_size=args.outbox_size,
+    )
+    logger.info("mock_exchange_starting", host=args.host, port=args.port)
+    web.run_app(exchange.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
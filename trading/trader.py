@@ -1,15 +1,26 @@
 import asyncio
+import os
 import random
+import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from trading.binance_client import BinanceClient
+from trading.exchange_info import ExchangeInfoCache
 from core import (
     WebSocketManager, FeatureEngine, ModelManager,
     ColdStartEngine, RiskManager, ScoringEngine
 )
+from core.decoder import KlineRecord, Message, TradeRecord
+from core.feature_engine import BASE_TIMEFRAME
+from core.order_book import OrderBookManager
+from core.resampler import INTERVAL_MS
+from core.snapshot import read_snapshot, write_snapshot
 from database.manager import DatabaseManager
-from config import BINANCE_CONFIG, TRADING_CONFIG, MODEL_CONFIG
+from config import (
+    BINANCE_CONFIG, TRADING_CONFIG, MODEL_CONFIG, FEATURE_CONFIG,
+    PERSISTENCE_CONFIG, SYSTEM_CONFIG, WEBSOCKET_CONFIG
+)
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,15 +29,36 @@ class SelfLearningTrader:
     def __init__(self):
         self.db_manager = DatabaseManager()
         self.binance_client = BinanceClient()
-        self.ws_manager = WebSocketManager()
+        self.ws_manager = WebSocketManager(self.binance_client.clock)
         self.feature_engine = FeatureEngine()
         self.model_manager = ModelManager(self.db_manager)
         self.cold_start_engine = ColdStartEngine()
         self.risk_manager = RiskManager()
         self.scoring_engine = ScoringEngine()
+        self.price_cache = self.binance_client.price_cache
+        self.exchange_info = ExchangeInfoCache(
+            self.binance_client.get_exchange_info,
+            BINANCE_CONFIG["SYMBOLS"],
+            TRADING_CONFIG["EXCHANGE_INFO_REFRESH_INTERVAL"],
+            TRADING_CONFIG["EXCHANGE_INFO_RETRY_INTERVAL"]
+        )
+        self.order_books = OrderBookManager(
+            self.binance_client.get_order_book,
+            WEBSOCKET_CONFIG["ORDER_BOOK_SNAPSHOT_DEPTH"],
+            WEBSOCKET_CONFIG["ORDER_BOOK_MAX_LEVELS"]
+        )
         
         self.running = False
+        self.handlers_registered = False
         self.open_trades: Dict[int, Dict[str, Any]] = {}
+        self.backfill_stats = {
+            'backfills': 0,
+            'bars_backfilled': 0,
+            'failures': 0,
+        }
+        self.snapshot_path = os.path.join(
+            SYSTEM_CONFIG["DATA_PATH"], "snapshots", "market_state"
+        )
         
         logger.info("self_learning_trader_initialized")
     
@@ -35,19 +67,166 @@ class SelfLearningTrader:
         
         symbols = BINANCE_CONFIG["SYMBOLS"]
         
+        snapshot_time = None
+        if PERSISTENCE_CONFIG["SNAPSHOT_ENABLED"]:
+            snapshot_time = self._restore_snapshot()
+        
+        await self.binance_client.warm_up()
+        await self.binance_client.clock.sync()
+        await self.exchange_info.load()
+        
         await self.ws_manager.connect(symbols)
         
-        for symbol in symbols:
-            self.ws_manager.register_handler(symbol, self._handle_market_data)
+        self._register_handlers(symbols)
+        
+        if FEATURE_CONFIG["WARM_START_ENABLED"]:
+            await self._warm_start(symbols, since=snapshot_time)
         
         asyncio.create_task(self._trading_loop())
         asyncio.create_task(self._monitor_positions())
         asyncio.create_task(self._periodic_training())
-        asyncio.create_task(self.ws_manager.cleanup_old_data())
+        asyncio.create_task(self.binance_client.clock.run())
+        asyncio.create_task(self.binance_client.keep_warm())
+        asyncio.create_task(self.exchange_info.run())
+        if PERSISTENCE_CONFIG["SNAPSHOT_ENABLED"]:
+            asyncio.create_task(self._periodic_snapshot())
         
         logger.info("trader_started", symbols=symbols)
     
-    async def _handle_market_data(self, data: Dict[str, Any]):
+    async def replay(self, path: str, speed: Optional[float] = None) -> int:
+        """Runs recorded market data through the same handlers the live stream uses."""
+        self._register_handlers(BINANCE_CONFIG["SYMBOLS"])
+        return await self.ws_manager.replay(path, speed)
+    
+    def _register_handlers(self, symbols: List[str]):
+        # start() and replay() share the manager, so a second call must not double-dispatch
+        if self.handlers_registered:
+            return
+        for symbol in symbols:
+            self.ws_manager.register_handler(symbol, self._handle_market_data)
+        self.handlers_registered = True
+    
+    async def _warm_start(self, symbols: List[str], since: Optional[float] = None):
+        # the live stream is already feeding the engine; load_kline_array merges by open time
+        full_bars = FEATURE_CONFIG["MARKET_STRUCTURE_WINDOW"] + 1
+        now_ms = self.binance_client.clock.now_ms()
+        started = datetime.utcnow()
+        
+        start_times = {}
+        for timeframe in FEATURE_CONFIG["TIMEFRAMES"]:
+            interval_ms = INTERVAL_MS[timeframe]
+            start_times[timeframe] = now_ms - full_bars * interval_ms
+            if since is not None:
+                # a restored snapshot only needs the bars since it was taken
+                start_times[timeframe] = max(start_times[timeframe], int(since * 1000) - interval_ms)
+        
+        # one call, so a single semaphore bounds every request of the warm start
+        klines = await self.binance_client.get_klines_many(
+            symbols, FEATURE_CONFIG["TIMEFRAMES"], start_times, now_ms,
+            concurrency=FEATURE_CONFIG["WARM_START_CONCURRENCY"]
+        )
+        
+        # closed-bar filtering compares against exchange time, not the local clock
+        loaded = [
+            self.feature_engine.load_kline_array(
+                symbol, bars, timeframe, self.binance_client.clock.now_ms()
+            )
+            for (symbol, timeframe), bars in klines.items()
+        ]
+        
+        logger.info("warm_start_completed",
+                   symbols=len(symbols),
+                   bars_loaded=sum(loaded),
+                   duration=(datetime.utcnow() - started).total_seconds())
+    
+    async def _backfill_gaps(self):
+        gaps = self.feature_engine.get_kline_gaps()
+        if not gaps:
+            return
+        
+        interval_ms = INTERVAL_MS[BASE_TIMEFRAME]
+        max_bars = FEATURE_CONFIG["MARKET_STRUCTURE_WINDOW"]
+        
+        async def backfill(symbol: str, start: int, end: int):
+            # only the part of the gap that still fits in the buffer is worth fetching
+            fetch_start = max(start, end - (max_bars - 1) * interval_ms)
+            limit = min((end - fetch_start) // interval_ms + 1, 1000)
+            
+            try:
+                klines = await self.binance_client.get_klines(
+                    symbol, BASE_TIMEFRAME, limit,
+                    start_time=fetch_start, end_time=end
+                )
+                if not isinstance(klines, list):
+                    raise ValueError(str(klines))
+            except Exception as e:
+                self.backfill_stats['failures'] += 1
+                logger.warning("kline_backfill_failed",
+                             symbol=symbol,
+                             start=start,
+                             end=end,
+                             error=str(e))
+                return
+            
+            loaded = self.feature_engine.load_klines(
+                symbol, klines, BASE_TIMEFRAME, self.binance_client.clock.now_ms()
+            )
+            self.feature_engine.clear_kline_gap(symbol, start, end)
+            self.backfill_stats['backfills'] += 1
+            self.backfill_stats['bars_backfilled'] += loaded
+            
+            logger.info("kline_gap_backfilled",
+                       symbol=symbol,
+                       start=start,
+                       end=end,
+                       bars=loaded)
+        
+        await asyncio.gather(*(
+            backfill(symbol, start, end) for symbol, (start, end) in gaps.items()
+        ))
+    
+    def _restore_snapshot(self) -> Optional[float]:
+        snapshot = read_snapshot(self.snapshot_path, PERSISTENCE_CONFIG["SNAPSHOT_MAX_AGE"])
+        if snapshot is None:
+            return None
+        
+        created_at, arrays, extra = snapshot
+        self.feature_engine.import_state(arrays)
+        try:
+            self.ws_manager.import_buffers(extra.get('websocket_buffers', {}))
+        except Exception as e:
+            logger.warning("snapshot_buffers_dropped", error=str(e))
+        
+        logger.info("snapshot_restored",
+                   path=self.snapshot_path,
+                   age=time.time() - created_at,
+                   arrays=len(arrays))
+        return created_at
+    
+    async def _save_snapshot(self):
+        arrays = self.feature_engine.export_state()
+        extra = {'websocket_buffers': self.ws_manager.export_buffers()}
+        await asyncio.to_thread(write_snapshot, self.snapshot_path, arrays, extra)
+    
+    async def _periodic_snapshot(self):
+        while self.running:
+            try:
+                await asyncio.sleep(PERSISTENCE_CONFIG["STATE_SAVE_INTERVAL"])
+                await self._save_snapshot()
+            except Exception as e:
+                logger.error("snapshot_save_failed", error=str(e))
+    
+    async def _handle_market_data(self, data: Message):
+        if isinstance(data, KlineRecord):
+            if data.closed:
+                self.feature_engine.add_kline_record(data)
+            return
+        
+        if isinstance(data, TradeRecord):
+            self.feature_engine.add_trade_record(data)
+            self.price_cache.update_trade(data.symbol, data.price, data.received_at)
+            return
+        
         if 'stream' not in data:
             return
         
@@ -63,6 +242,17 @@ class SelfLearningTrader:
         
         elif stream_name.endswith('@trade'):
             self.feature_engine.add_trade(symbol, stream_data)
+            self.price_cache.update_trade(
+                symbol, float(stream_data['p']), data.get('received_at')
+            )
+        
+        elif stream_name.endswith('@bookTicker'):
+            self.price_cache.update_book_ticker(
+                symbol, stream_data, data.get('received_at')
+            )
+        
+        elif '@depth' in stream_name:
+            self.order_books.handle_diff(symbol, stream_data)
     
     async def _trading_loop(self):
         while self.running:
@@ -75,11 +265,20 @@ class SelfLearningTrader:
                 if len(self.open_trades) >= TRADING_CONFIG["MAX_CONCURRENT_POSITIONS"]:
                     continue
                 
-                for symbol in BINANCE_CONFIG["SYMBOLS"]:
+                await self._backfill_gaps()
+                
+                symbols, feature_matrix = self.feature_engine.calculate_features_batch(
+                    BINANCE_CONFIG["SYMBOLS"]
+                )
+                predictions, confidences = self.model_manager.predict_batch(feature_matrix)
+                
+                for symbol, prediction, confidence in zip(symbols, predictions, confidences):
                     if len(self.open_trades) >= TRADING_CONFIG["MAX_CONCURRENT_POSITIONS"]:
                         break
                     
-                    signal = await self._generate_signal(symbol)
+                    signal = await self._generate_signal(
+                        symbol, int(prediction), float(confidence)
+                    )
                     
                     if signal and signal['should_trade']:
                         await self._execute_trade(symbol, signal)
@@ -87,14 +286,15 @@ class SelfLearningTrader:
             except Exception as e:
                 logger.error("trading_loop_error", error=str(e))
     
-    async def _generate_signal(self, symbol: str) -> Optional[Dict[str, Any]]:
-        features = self.feature_engine.calculate_features(symbol)
+    async def _generate_signal(self,
+                               symbol: str,
+                               prediction: int,
+                               confidence: float) -> Optional[Dict[str, Any]]:
+        features = self.feature_engine.get_cached_features(symbol)
         
         if not features:
             return None
         
-        prediction, confidence = self.model_manager.predict(features)
-        
         thresholds = self.cold_start_engine.get_thresholds()
         
         exploration_prob = thresholds.get('exploration_prob', 0.0)
@@ -137,9 +337,12 @@ class SelfLearningTrader:
                 max_leverage
             )
             
+            indicators = self.feature_engine.get_indicators(symbol)
+            
             stop_loss_price = self.risk_manager.calculate_stop_loss(
                 current_price,
-                signal['side']
+                signal['side'],
+                atr=indicators.get('atr')
             )
             
             position_size = self.risk_manager.calculate_position_size(
@@ -164,6 +367,23 @@ class SelfLearningTrader:
             
             quantity = position_size / current_price
             
+            # without the symbol's filters the quantity cannot be rounded, so the order would be rejected
+            filters = self.exchange_info.get(symbol)
+            if filters is None:
+                logger.warning("trade_rejected",
+                             symbol=symbol,
+                             reason="symbol filters unavailable")
+                return
+            
+            quantity = filters.round_quantity(quantity)
+            rejection = (filters.validate(quantity, current_price)
+                         or self._book_rejection(symbol, signal['side'], quantity * current_price))
+            if rejection:
+                logger.warning("trade_rejected",
+                             symbol=symbol,
+                             reason=rejection)
+                return
+            
             order = await self.binance_client.create_order(
                 symbol=symbol,
                 side=signal['side'],
@@ -199,18 +419,37 @@ class SelfLearningTrader:
                 'order': order
             }
             
+            book = self.order_books.get(symbol)
             logger.info("trade_opened",
                        trade_id=trade.id,
                        symbol=symbol,
                        side=signal['side'],
                        price=current_price,
-                       confidence=signal['confidence'])
+                       confidence=signal['confidence'],
+                       book_imbalance=book.imbalance(WEBSOCKET_CONFIG["ORDER_BOOK_LEVELS"]) if book else None)
             
         except Exception as e:
             logger.error("trade_execution_failed", 
                         symbol=symbol, 
                         error=str(e))
     
+    def _book_rejection(self, symbol: str, side: str, notional: float) -> Optional[str]:
+        """Why the synced depth book says a market order would fill badly, or None (also without a book)."""
+        book = self.order_books.get(symbol)
+        mid = book.mid_price() if book else None
+        if not mid:
+            return None
+
+        spread = book.spread() / mid
+        if spread > TRADING_CONFIG["SLIPPAGE_TOLERANCE"]:
+            return f"spread {spread:.5f} above slippage tolerance"
+
+        levels = WEBSOCKET_CONFIG["ORDER_BOOK_LEVELS"]
+        available = book.liquidity(levels)['asks' if side == 'BUY' else 'bids']
+        if notional > available:
+            return f"notional {notional:.2f} exceeds top {levels} levels ({available:.2f})"
+        return None
+    
     async def _monitor_positions(self):
         while self.running:
             try:
@@ -316,6 +555,14 @@ class SelfLearningTrader:
     
     async def stop(self):
         self.running = False
+        self.binance_client.clock.stop()
+        self.exchange_info.stop()
+        
+        if PERSISTENCE_CONFIG["SNAPSHOT_ENABLED"]:
+            try:
+                await self._save_snapshot()
+            except Exception as e:
+                logger.error("snapshot_save_failed", error=str(e))
         
         await self.ws_manager.close()
         await self.binance_client.close()
@@ -334,5 +581,20 @@ class SelfLearningTrader:
             'phase': phase_info,
             'statistics': stats,
             'risk': risk_status,
-            'model': model_info
+            'model': model_info,
+            'feature_cache': self.feature_engine.get_cache_stats(),
+            'websocket_queue': self.ws_manager.get_queue_stats(),
+            'websocket_latency': self.ws_manager.get_latency_stats(),
+            'clock': self.binance_client.clock.get_stats(),
+            'rate_limit': self.binance_client.get_rate_limit_stats(),
+            'http_pool': self.binance_client.get_pool_stats(),
+            'exchange_info': self.exchange_info.get_stats(),
+            'order_books': self.order_books.get_stats(),
+            'price_cache': self.price_cache.get_stats(),
+            'backfill': {
+                **self.backfill_stats,
+                'gaps_detected': self.feature_engine.gaps_detected,
+                'open_gaps': len(self.feature_engine.kline_gaps),
+                'reconnects': self.ws_manager.reconnect_count,
+            }
         }
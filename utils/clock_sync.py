@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ClockSync:
+    """Estimates the offset between the local clock and the exchange clock.
+
+    Each round takes a few request/response samples against a server time
+    endpoint and keeps the one with the smallest round trip, since its
+    midpoint assumption has the least room for error (NTP-style min-RTT
+    filtering). ``now()`` is local time corrected to exchange time.
+    ``fetch_server_time`` returns the local time the request actually left
+    together with the server time in ms, so time spent queued before sending
+    does not count towards the round trip. Without it the offset simply
+    stays at zero.
+    """
+
+    def __init__(self,
+                 fetch_server_time: Optional[Callable[[], Awaitable[Tuple[float, int]]]] = None,
+                 sync_interval: float = 300.0,
+                 max_drift: float = 0.5,
+                 samples: int = 5):
+        self.fetch_server_time = fetch_server_time
+        self.sync_interval = sync_interval
+        self.max_drift = max_drift
+        self.samples = samples
+
+        self.offset = 0.0
+        self.rtt: Optional[float] = None
+        self.last_sync: Optional[float] = None
+        self.sync_count = 0
+        self.drift_alerts = 0
+        self.running = False
+
+    def now(self) -> float:
+        return time.time() + self.offset
+
+    def now_ms(self) -> int:
+        return int(self.now() * 1000)
+
+    async def _sample(self):
+        sent, server_ms = await self.fetch_server_time()
+        received = time.time()
+
+        rtt = received - sent
+        offset = server_ms / 1000 - (sent + received) / 2
+        return rtt, offset
+
+    async def sync(self) -> Optional[float]:
+        if self.fetch_server_time is None:
+            return None
+
+        best = None
+        for _ in range(self.samples):
+            try:
+                rtt, offset = await self._sample()
+            except Exception as e:
+                logger.warning("clock_sample_failed", error=str(e))
+                continue
+            if best is None or rtt < best[0]:
+                best = (rtt, offset)
+
+        if best is None:
+            logger.error("clock_sync_failed", samples=self.samples)
+            return None
+
+        rtt, offset = best
+        change = offset - self.offset if self.last_sync is not None else 0.0
+
+        self.offset = offset
+        self.rtt = rtt
+        self.last_sync = time.time()
+        self.sync_count += 1
+
+        if abs(offset) > self.max_drift or abs(change) > self.max_drift:
+            self.drift_alerts += 1
+            logger.warning("clock_drift_exceeded",
+                         offset=offset,
+                         change=change,
+                         rtt=rtt,
+                         max_drift=self.max_drift)
+        else:
+            logger.debug("clock_synced", offset=offset, change=change, rtt=rtt)
+
+        return offset
+
+    async def run(self):
+        self.running = True
+        while self.running:
+            await asyncio.sleep(self.sync_interval)
+            await self.sync()
+
+    def stop(self):
+        self.running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'offset': self.offset,
+            'rtt': self.rtt,
+            'last_sync': self.last_sync,
+            'sync_count': self.sync_count,
+            'drift_alerts': self.drift_alerts,
+        }
@@ -0,0 +1,77 @@
+import math
+import time
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+PERCENTILES = (50, 90, 99)
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram over a rolling window of ``slots`` sub-histograms, accurate to ``growth``."""
+
+    def __init__(self,
+                 window_seconds: float = 60.0,
+                 slots: int = 6,
+                 min_value: float = 1e-5,
+                 max_value: float = 100.0,
+                 growth: float = 1.25):
+        self.slots = slots
+        self.slot_seconds = window_seconds / slots
+        self.min_value = min_value
+        self.growth = growth
+        self._log_min = math.log(min_value)
+        self._log_growth = math.log(growth)
+
+        # bucket 0 collects values below min_value, the last one values above max_value
+        self.bucket_count = int(math.ceil(
+            (math.log(max_value) - self._log_min) / self._log_growth
+        )) + 2
+        self.counts = np.zeros((slots, self.bucket_count), dtype=np.int32)
+        self.maxima = np.zeros(slots)
+        self._epochs = np.full(slots, -1, dtype=np.int64)
+
+    def _bucket(self, value: float) -> int:
+        if value < self.min_value:
+            return 0
+        index = int((math.log(value) - self._log_min) / self._log_growth) + 1
+        return min(index, self.bucket_count - 1)
+
+    def _upper_bound(self, index: int) -> float:
+        return self.min_value * self.growth ** index
+
+    def record(self, value: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        epoch = int(now // self.slot_seconds)
+        slot = epoch % self.slots
+
+        if self._epochs[slot] != epoch:
+            self.counts[slot] = 0
+            self.maxima[slot] = 0.0
+            self._epochs[slot] = epoch
+
+        self.counts[slot, self._bucket(value)] += 1
+        if value > self.maxima[slot]:
+            self.maxima[slot] = value
+
+    def summary(self,
+                percentiles: Sequence[int] = PERCENTILES,
+                now: Optional[float] = None) -> Dict[str, float]:
+        now = time.time() if now is None else now
+        epoch = int(now // self.slot_seconds)
+        live = self._epochs > epoch - self.slots
+
+        counts = self.counts[live].sum(axis=0)
+        total = int(counts.sum())
+        result = {'count': total}
+        if total == 0:
+            result.update({f"p{p}": 0.0 for p in percentiles})
+            result['max'] = 0.0
+            return result
+
+        maximum = float(self.maxima[live].max())
+        cumulative = np.cumsum(counts)
+        for p in percentiles:
+            index = int(np.searchsorted(cumulative, total * p / 100.0))
+            result[f"p{p}"] = min(self._upper_bound(index), maximum)
+        result['max'] = maximum
+        return result
@@ -0,0 +1,151 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.histogram import LatencyHistogram
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PRIORITY_ORDER = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET_DATA = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_ORDER: 'order',
+    PRIORITY_ACCOUNT: 'account',
+    PRIORITY_MARKET_DATA: 'market_data',
+}
+
+
+class WeightRateLimiter:
+    """Token bucket over request weight, shared by every REST call, refilling ``capacity`` per ``period``."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+        # ordered by priority then arrival, so a lane keeps its order and heavy requests aren't starved
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._scheduler: Optional[asyncio.Task] = None
+
+        self.wait_times = {lane: LatencyHistogram() for lane in PRIORITY_NAMES}
+        self.requests = 0
+        self.queued = 0
+        self.max_queue = 0
+        self.header_syncs = 0
+        self.pauses = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, weight: int = 1, priority: int = PRIORITY_MARKET_DATA) -> float:
+        """Waits until ``weight`` can be spent and returns the time waited."""
+        weight = min(float(weight), self.capacity)
+        started = time.monotonic()
+        self.requests += 1
+        self._refill(started)
+
+        if not self._waiters and started >= self._paused_until and self.tokens >= weight:
+            self.tokens -= weight
+            self.wait_times[priority].record(0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), weight, future))
+        self.queued += 1
+        self.max_queue = max(self.max_queue, len(self._waiters))
+        self._ensure_scheduler()
+
+        await future
+        waited = time.monotonic() - started
+        self.wait_times[priority].record(waited)
+        return waited
+
+    def _ensure_scheduler(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._schedule())
+
+    async def _schedule(self):
+        waiters = self._waiters
+        while waiters:
+            now = time.monotonic()
+            self._refill(now)
+
+            # drop requests whose caller has gone away
+            while waiters and waiters[0][3].done():
+                heapq.heappop(waiters)
+            if not waiters:
+                break
+
+            _, _, weight, future = waiters[0]
+            if now >= self._paused_until and self.tokens >= weight:
+                heapq.heappop(waiters)
+                self.tokens -= weight
+                future.set_result(None)
+                continue
+
+            delay = max(self._paused_until - now, (weight - self.tokens) / self.rate)
+            self._wakeup.clear()
+            try:
+                # a new higher priority waiter or a pause re-evaluates the head early
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def sync_used_weight(self, used: int):
+        """Aligns the bucket with the ``X-MBX-USED-WEIGHT-1M`` header of a response."""
+        self._refill(time.monotonic())
+        available = self.capacity - used
+        if available < self.tokens:
+            self.tokens = max(available, 0.0)
+        self.header_syncs += 1
+
+    def pause(self, seconds: float):
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0.0
+        self._paused_until = max(self._paused_until, now + seconds)
+        self.pauses += 1
+        logger.warning("rate_limiter_paused", seconds=seconds)
+        if self._waiters:
+            self._ensure_scheduler()
+
+    def get_stats(self) -> Dict[str, Any]:
+        # read from the Flask thread, so compute the refill without writing it back
+        available = min(self.capacity,
+                        self.tokens + (time.monotonic() - self._updated) * self.rate)
+        return {
+            'capacity': self.capacity,
+            'available': available,
+            'queue_depth': len(self._waiters),
+            'max_queue': self.max_queue,
+            'requests': self.requests,
+            'queued': self.queued,
+            'header_syncs': self.header_syncs,
+            'pauses': self.pauses,
+            'wait_time': {
+                name: self.wait_times[lane].summary()
+                for lane, name in PRIORITY_NAMES.items()
+            },
+        }
+
+    async def close(self):
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            self._scheduler = None
+        for _, _, _, future in self._waiters:
+            if not future.done():
+                future.cancel()
+        self._waiters.clear()